@@ -0,0 +1,52 @@
+"""
+Background event loop for the async data layer
+
+Streamlit runs the app script synchronously, while Motor clients are bound
+to the event loop they were created on. One long-lived loop runs on a daemon
+thread; the script hands it coroutines through run() and gather(), which
+block until the results are ready. gather() bounds how many of its
+coroutines await the database at once.
+"""
+
+import asyncio
+import threading
+
+
+class BackgroundLoop:
+    """An asyncio loop on a daemon thread, started on first use"""
+
+    def __init__(self, max_concurrency: int = 8, name: str = "async-db"):
+        self.max_concurrency = max_concurrency
+        self.name = name
+        self._loop = None
+        self._semaphore = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name=self.name, daemon=True).start()
+                    self._loop = loop
+        return self._loop
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the loop and wait for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def gather(self, *coros, timeout: float = None) -> list:
+        """Run coroutines concurrently, at most max_concurrency at a time; results in order"""
+        return self.run(self._gather(coros), timeout)
+
+    async def _gather(self, coros) -> list:
+        if self._semaphore is None:
+            # Created on the loop thread, shared by every gather
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def bounded(coro):
+            async with self._semaphore:
+                return await coro
+
+        return await asyncio.gather(*(bounded(coro) for coro in coros))
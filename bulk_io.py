@@ -0,0 +1,114 @@
+"""
+Streaming JSON / NDJSON reading and writing for bulk import and export
+
+iter_records reads records one at a time from either a JSON array or
+newline-delimited JSON (one value per line), holding only the current chunk
+of the file in memory. write_records writes an iterable of records in either
+format without collecting them first.
+"""
+
+import json
+from datetime import datetime
+
+CHUNK_SIZE = 64 * 1024
+FORMATS = ("ndjson", "json")
+_WHITESPACE = " \t\r\n"
+
+
+class _Reader:
+    """Incremental JSON value decoder over a text file"""
+
+    def __init__(self, fp, chunk_size):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _more(self, size):
+        chunk = self.fp.read(size)
+        if not chunk:
+            self.eof = True
+            return False
+        # Drop what has been consumed so the buffer stays one chunk-ish long
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or "" at end of file"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more(self.chunk_size):
+                return ""
+
+    def advance(self):
+        self.pos += 1
+
+    def value(self):
+        self.peek()  # raw_decode does not skip leading whitespace
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self.eof or not self._more(size):
+                    raise
+            else:
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buf) or self.eof or not self._more(size):
+                    self.pos = end
+                    return value
+                continue
+            # Grow reads for values larger than a chunk, so they decode in O(n)
+            size *= 2
+
+
+def iter_records(fp, chunk_size: int = CHUNK_SIZE):
+    """Yield the records of a JSON array or of NDJSON / concatenated JSON values"""
+    reader = _Reader(fp, chunk_size)
+    if reader.peek() != "[":
+        while reader.peek():
+            yield reader.value()
+        return
+    reader.advance()
+    if reader.peek() == "]":
+        return
+    while True:
+        yield reader.value()
+        separator = reader.peek()
+        reader.advance()
+        if separator == "]":
+            return
+        if separator != ",":
+            raise ValueError(f"Expected ',' or ']' between array elements, got {separator!r}")
+
+
+def _default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def write_records(records, fp, fmt: str = "ndjson") -> int:
+    """Write records as NDJSON or a JSON array; returns how many were written"""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format {fmt!r}; expected one of {FORMATS}")
+    count = 0
+    if fmt == "json":
+        fp.write("[")
+    for record in records:
+        line = json.dumps(record, default=_default, ensure_ascii=False)
+        if fmt == "json":
+            fp.write(",\n" if count else "\n")
+            fp.write(line)
+        else:
+            fp.write(line + "\n")
+        count += 1
+    if fmt == "json":
+        fp.write("\n]\n" if count else "]\n")
+    return count
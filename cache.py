@@ -0,0 +1,118 @@
+"""
+Process-wide caches for the Lost & Found Platform
+
+Streamlit runs every browser session in the same Python process, so a
+module-level cache is shared by all sessions. Cached values are shared
+objects and must be treated as read-only by callers.
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds"""
+
+    def __init__(self, maxsize: int = 128, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        # Bumped by invalidate() and clear(); loads started under an older
+        # generation return their value but do not store it
+        self.generation = 0
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._loading = {}  # key -> Future of the load in flight
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None, generation: int = None) -> bool:
+        """Store value; with generation, only if nothing was invalidated since it was read"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+            return True
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss.
+
+        Concurrent misses on the same key share one loader() call; its
+        exception, if any, is raised to every caller. A value loaded across
+        an invalidate() or clear() is returned but not cached.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            future = self._loading.get(key)
+            if future is not None:
+                leader = False
+            else:
+                leader = True
+                future = self._loading[key] = Future()
+                generation = self.generation
+        if not leader:
+            return future.result()
+        try:
+            value = loader()
+        except BaseException as e:
+            self._finish_load(key, future)
+            future.set_exception(e)
+            raise
+        self.set(key, value, generation=generation)
+        self._finish_load(key, future)
+        future.set_result(value)
+        return value
+
+    def _finish_load(self, key, future) -> None:
+        with self._lock:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+            # Later callers start a fresh load instead of joining a stale one
+            self._loading.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+            self._loading.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
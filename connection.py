@@ -0,0 +1,82 @@
+"""
+MongoDB connection health for the Lost & Found Platform
+
+A CircuitBreaker fed by pymongo's topology monitoring lets get_db fail fast
+while the cluster is unreachable, instead of every rerun waiting out the
+server selection timeout. Health is learned from the driver's background
+heartbeats, so no user-facing request has to probe the server.
+"""
+
+import time
+import threading
+
+from pymongo import monitoring
+
+
+class CircuitBreaker:
+    """Opens after a failure and lets one trial caller through after an exponential backoff
+
+    Once the backoff has elapsed the breaker is half-open: the first allow()
+    claims the trial and every other caller is refused until that trial ends
+    with record_success or record_failure.
+    """
+
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 60.0, clock=time.monotonic):
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.failures = 0
+        self._open_until = 0.0
+        self._trial = False
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.failures == 0:
+                return "closed"
+            return "open" if self._clock() < self._open_until else "half-open"
+
+    def allow(self) -> bool:
+        """True while closed, and for the single trial caller once half-open"""
+        with self._lock:
+            if self.failures == 0:
+                return True
+            if self._trial or self._clock() < self._open_until:
+                return False
+            self._trial = True
+            return True
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+            self._open_until = self._clock() + delay
+            self._trial = False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._open_until = 0.0
+            self._trial = False
+
+
+class BreakerTopologyListener(monitoring.TopologyListener):
+    """Closes the breaker when a readable server appears and opens it when none is left"""
+
+    def __init__(self, breaker: CircuitBreaker):
+        self.breaker = breaker
+
+    def opened(self, event):
+        pass
+
+    def closed(self, event):
+        pass
+
+    def description_changed(self, event):
+        description = event.new_description
+        if description.has_readable_server():
+            self.breaker.record_success()
+        elif any(sd.error is not None for sd in description.server_descriptions().values()):
+            # Only after a heartbeat actually failed, not while servers are still unknown
+            self.breaker.record_failure()
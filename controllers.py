@@ -2,10 +2,15 @@
 Controllers and business logic for the Lost & Found Platform
 """
 
+import json
+import base64
+import numpy as np
 import streamlit as st
 import utils
+import search
+import listing_index
 from datetime import datetime, timedelta
-from models import CATEGORIES, ITEMS_PER_PAGE, FILTER_TYPES, FILTER_STATUSES, FILTER_CATEGORIES
+from models import CATEGORIES, ITEMS_PER_PAGE, FILTER_TYPES, FILTER_STATUSES, FILTER_CATEGORIES, Item
 import extra_streamlit_components as stx
 
 
@@ -14,7 +19,13 @@ def initialize_session_state():
     defaults = {
         "user": None,
         "menu": "Home",
-        "page": 1,
+        "page_cursors": [None],
+        "feed_filters": None,
+        "feed_items": [],
+        "feed_cursor": None,
+        "feed_total": 0,
+        "feed_loaded": False,
+        "my_items_page": 1,
         "show_auth": None,
         "dark_mode": False,
     }
@@ -39,8 +50,9 @@ def restore_login_from_cookie(cookie_manager):
 def handle_nav_click(page: str):
     """Handle navigation menu click"""
     st.session_state["menu"] = page
-    st.session_state["page"] = 1
     st.session_state["show_auth"] = None
+    st.session_state["my_items_page"] = 1
+    reset_feed()
 
 
 def handle_toggle_dark_mode():
@@ -48,6 +60,16 @@ def handle_toggle_dark_mode():
     st.session_state["dark_mode"] = not st.session_state["dark_mode"]
 
 
+def flash(kind: str, message: str):
+    """Queue a message for views.render_flash; callbacks run before the page is drawn"""
+    st.session_state["flash"] = (kind, message)
+
+
+def handle_show_auth(mode):
+    """Open the login/register form (mode "login" or "register"), or close it with None"""
+    st.session_state["show_auth"] = mode
+
+
 def handle_logout(cookie_manager):
     """Handle user logout"""
     token = cookie_manager.get("session_token")
@@ -59,12 +81,16 @@ def handle_logout(cookie_manager):
     st.session_state["user"] = None
     st.session_state["menu"] = "Home"
     st.session_state["show_auth"] = None
-    st.rerun()
 
 
-def handle_login(username: str, password: str, cookie_manager):
-    """Handle user login"""
-    if utils.authenticate_user(username, password):
+def handle_login(cookie_manager):
+    """Handle user login from the login form's widget values"""
+    username = st.session_state.get("login_user", "")
+    password = st.session_state.get("login_pass", "")
+    authenticated = utils.authenticate_user(username, password)
+    if authenticated is None:
+        flash("warning", "Server is busy, please try again in a moment")
+    elif authenticated:
         token = utils.create_session(username)
         cookie_manager.set(
             "session_token",
@@ -74,103 +100,293 @@ def handle_login(username: str, password: str, cookie_manager):
         st.session_state["user"] = username
         st.session_state["menu"] = "Home"
         st.session_state["show_auth"] = None
-        st.rerun()
     else:
-        st.error("Invalid username or password")
+        flash("error", "Invalid username or password")
 
 
-def handle_register(username: str, password: str, contact: str):
-    """Handle user registration"""
-    success, msg = utils.register_user(username, password, contact)
+def handle_register():
+    """Handle user registration from the sign-up form's widget values"""
+    success, msg = utils.register_user(
+        st.session_state.get("reg_user", ""),
+        st.session_state.get("reg_pass", ""),
+        st.session_state.get("reg_contact", "")
+    )
     if success:
-        st.success(msg + " — You can now sign in.")
+        flash("success", msg + " — You can now sign in.")
         st.session_state["show_auth"] = "login"
-        st.rerun()
     else:
-        st.error(msg)
+        flash("error", msg)
 
 
 def filter_items(items: list, search_term: str = "", filter_type: str = "All",
                 filter_status: str = "All", filter_category: str = "All",
                 date_from = None, date_to = None) -> list:
-    """Apply filters to items list"""
-    filtered_items = []
-    
-    for item in items:
-        if filter_type != "All" and item['type'] != filter_type:
-            continue
-        if filter_status != "All" and item.get('status', 'Active') != filter_status:
-            continue
-        if filter_category != "All" and item.get('category', 'Other') != filter_category:
-            continue
-        if search_term:
-            term = search_term.lower()
-            if (term not in item['title'].lower()
-                    and term not in item['description'].lower()
-                    and term not in item.get('location', '').lower()):
-                continue
-        try:
-            if date_from and date_to:
-                item_date = datetime.strptime(item['date'], '%Y-%m-%d').date()
-                if item_date < date_from or item_date > date_to:
-                    continue
-        except (ValueError, KeyError):
-            pass
-        
-        filtered_items.append(item)
-    
-    return list(reversed(filtered_items))
+    """Apply filters to items list, ranking by relevance when searching"""
+    columns = listing_index.get_columns(items)
+    filters = {
+        "search_term": search_term,
+        "filter_type": filter_type,
+        "filter_status": filter_status,
+        "filter_category": filter_category,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
 
+    def matching_rows():
+        # Like split_query on the Mongo path, a term without any words is no search
+        scores = search.get_item_index(items).search(search_term) if search.tokenize(search_term) else None
+        mask = columns.mask(filter_type, filter_status, filter_category, date_from, date_to, ids=scores)
+        # items are oldest first; listings show newest first
+        rows = np.flatnonzero(mask)[::-1].tolist()
+        if scores:
+            # Stable sort keeps newest first among equally relevant items
+            rows.sort(key=lambda row: scores[items[row].id], reverse=True)
+        return rows
+
+    # Re-rendering the same filters (e.g. a page flip) reuses the result
+    return [items[row] for row in columns.memoize("rows", filters, matching_rows)]
+
+
+def encode_cursor(position: dict) -> str:
+    """Encode a feed position as an opaque URL-safe token"""
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor) -> dict:
+    """Decode a cursor from encode_cursor; None or a malformed cursor means the start"""
+    if not cursor:
+        return {}
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        return {}
+
+
+def _page_in_memory(items: list, position: dict, items_per_page: int) -> tuple:
+    offset = position.get("o", 0)
+    page_items = items[offset:offset + items_per_page]
+    next_offset = offset + items_per_page
+    next_cursor = encode_cursor({"o": next_offset}) if next_offset < len(items) else None
+    return page_items, len(items), next_cursor
+
+
+def query_items(search_term: str = "", filter_type: str = "All",
+                filter_status: str = "All", filter_category: str = "All",
+                date_from=None, date_to=None, cursor: str = None,
+                items_per_page: int = ITEMS_PER_PAGE) -> tuple:
+    """Get the page of filtered items starting at cursor.
+
+    Returns (page_items, total_items, next_cursor); next_cursor is None on the
+    last page. Listings sorted by recency page by (created_at, id) keyset, so
+    deep pages cost the same as the first; relevance-ranked searches and
+    in-memory listings page by offset.
+    """
+    position = decode_cursor(cursor)
+    filters = {
+        "search_term": search_term,
+        "filter_type": filter_type,
+        "filter_status": filter_status,
+        "filter_category": filter_category,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+
+    snapshot = utils.get_item_snapshot()
+    if snapshot is not None:
+        # The item watcher keeps listings in memory: no database round-trip
+        return _page_in_memory(filter_items(snapshot.items(), **filters), position, items_per_page)
+
+    query, page_args = _page_request(filters, position, items_per_page)
+    result = utils.find_items(query, **page_args)
+    if result is not None:
+        page_items, total_items = result
+        if "$text" in query:
+            offset = page_args["skip"]
+            has_more = offset + items_per_page < total_items
+            next_cursor = encode_cursor({"o": offset + items_per_page}) if has_more else None
+            return page_items, total_items, next_cursor
+        next_cursor = None
+        if len(page_items) > items_per_page:
+            page_items = page_items[:items_per_page]
+            last = page_items[-1]
+            next_cursor = encode_cursor({"t": last.created_at.isoformat(), "i": last.id})
+        return page_items, total_items, next_cursor
+
+    # Query failed (database unavailable, or e.g. the text index not built yet):
+    # filter the listings in memory instead, without their image bytes
+    return _page_in_memory(filter_items(utils.load_items(include_images=False), **filters),
+                           position, items_per_page)
+
+
+def _page_request(filters: dict, position: dict, items_per_page: int) -> tuple:
+    """(query, find_items keyword arguments) for the page at a decoded cursor position"""
+    query = utils.build_item_query(**filters)
+    if "$text" in query:
+        return query, {"skip": position.get("o", 0), "limit": items_per_page}
+    after = None
+    if "t" in position:
+        after = (datetime.fromisoformat(position["t"]), position["i"])
+    # One extra item tells whether there is a next page
+    return query, {"limit": items_per_page + 1, "after": after}
 
-def get_paginated_items(items: list, page: int, items_per_page: int = ITEMS_PER_PAGE) -> tuple:
-    """Get paginated items and page info"""
-    total_items = len(items)
-    total_pages = max(1, (total_items + items_per_page - 1) // items_per_page)
-    
-    start_idx = (page - 1) * items_per_page
-    end_idx = min(start_idx + items_per_page, total_items)
-    page_items = items[start_idx:end_idx]
-    
-    return page_items, total_items, total_pages
+
+def prefetch_listings(filters: dict, items_per_page: int = ITEMS_PER_PAGE):
+    """Fetch the facet counts and the current page concurrently before the listings render.
+
+    Both land in the shared listing cache, so the facet_counts and
+    query_items calls that follow are cache hits instead of two round-trips
+    in a row. Nothing to do while the item watcher serves listings from memory,
+    or before the driver has seen a readable server.
+    """
+    if utils.get_item_snapshot() is not None or not utils.db_readable():
+        # While MongoDB is unreachable the sync calls fall back on their own
+        return
+    # Changed filters restart both the pages and the feed (see sync_feed_filters)
+    unchanged = st.session_state["feed_filters"] == json.dumps(filters, sort_keys=True, default=str)
+    cursor, fetch_page = None, True
+    if not st.session_state.get("infinite_scroll"):
+        cursor = st.session_state["page_cursors"][-1] if unchanged else None
+    else:
+        # A loaded feed renders from session state; only its first batch is fetched
+        fetch_page = not (unchanged and st.session_state["feed_loaded"])
+    requests = [utils.facet_counts_async(**filters)]
+    if fetch_page:
+        query, page_args = _page_request(filters, decode_cursor(cursor), items_per_page)
+        requests.append(utils.find_items_async(query, **page_args))
+    utils.run_concurrently(*requests)
+
+
+def facet_counts(filters: dict) -> dict:
+    """Per-option result counts for the type, status and category dropdowns"""
+    snapshot = utils.get_item_snapshot()
+    if snapshot is not None:
+        items = snapshot.items()
+    else:
+        result = utils.facet_counts(**filters)
+        if result is not None:
+            return result
+        items = utils.load_items(include_images=False)
+    search_term = filters.get("search_term")
+    scores = search.get_item_index(items).search(search_term) if search.tokenize(search_term) else None
+    return listing_index.get_columns(items).facets(filters, ids=scores)
+
+
+def go_to_previous_page():
+    """on_click for the Previous button: drop the current page's cursor"""
+    cursors = st.session_state["page_cursors"]
+    if len(cursors) > 1:
+        cursors.pop()
+
+
+def go_to_next_page(cursor: str):
+    """on_click for the Next button: push the cursor of the page after this one"""
+    st.session_state["page_cursors"].append(cursor)
+
+
+def reset_feed():
+    """Return the listings to their first page and empty the infinite-scroll feed"""
+    st.session_state["page_cursors"] = [None]
+    st.session_state["feed_items"] = []
+    st.session_state["feed_cursor"] = None
+    st.session_state["feed_total"] = 0
+    st.session_state["feed_loaded"] = False
+
+
+def sync_feed_filters(filters: dict):
+    """Restart pagination when the listing filters change"""
+    signature = json.dumps(filters, sort_keys=True, default=str)
+    if st.session_state["feed_filters"] != signature:
+        st.session_state["feed_filters"] = signature
+        reset_feed()
+
+
+def load_more_items(filters: dict, items_per_page: int = ITEMS_PER_PAGE):
+    """Append the next batch to the infinite-scroll feed without refetching earlier ones"""
+    batch, total_items, next_cursor = query_items(
+        **filters, cursor=st.session_state["feed_cursor"], items_per_page=items_per_page
+    )
+    st.session_state["feed_items"].extend(batch)
+    st.session_state["feed_cursor"] = next_cursor
+    st.session_state["feed_total"] = total_items
+    st.session_state["feed_loaded"] = True
 
 
 def handle_post_item(title: str, itype: str, category: str, description: str,
                      location: str, date_obj, uploaded_file) -> bool:
     """Handle posting a new item"""
     if not title or not description or not location:
-        st.error("Please fill in all required fields.")
+        flash("error", "Please fill in all required fields.")
         return False
     
     image_obj = None
     if uploaded_file:
         image_obj = utils.save_uploaded_image(uploaded_file)
         if image_obj is None:
-            st.error("Image must be JPG/PNG and under 1 MB.")
+            flash("error", "Image must be JPG/PNG and under 1 MB.")
             return False
     
-    new_item = {
-        "id": utils.generate_item_id(),
-        "title": title,
-        "type": itype,
-        "category": category,
-        "description": description,
-        "location": location,
-        "date": str(date_obj),
-        "image": image_obj,
-        "owner": st.session_state["user"],
-        "status": "Active"
-    }
+    new_item = Item(
+        id=utils.generate_item_id(),
+        title=title,
+        itype=itype,
+        category=category,
+        description=description,
+        location=location,
+        date=str(date_obj),
+        image=image_obj,
+        owner=st.session_state["user"],
+        status="Active"
+    )
+    duplicate = None if utils.DUPLICATE_POLICY == "off" else utils.find_duplicate(new_item.to_dict())
+    if duplicate is not None:
+        message = f"This looks like a repeat of your listing \"{duplicate['title']}\" ({duplicate['date']})."
+        if utils.DUPLICATE_POLICY == "block":
+            if image_obj is not None:
+                utils.discard_uploaded_image(image_obj)
+            flash("error", message + " Update or resolve that listing instead of posting it again.")
+            return False
+        # A toast stays visible after the post switches the page to Home
+        st.toast(message, icon="⚠️")
+
     utils.save_item(new_item)
     return True
 
 
+def handle_post_item_click():
+    """on_click for Post Item: save the form and go to Home in the same run"""
+    posted = handle_post_item(
+        st.session_state.get("post_title", ""),
+        st.session_state.get("post_type"),
+        st.session_state.get("post_category"),
+        st.session_state.get("post_description", ""),
+        st.session_state.get("post_location", ""),
+        st.session_state.get("post_date"),
+        st.session_state.get("post_image"),
+    )
+    if posted:
+        for key in ("post_title", "post_description", "post_location"):
+            st.session_state[key] = ""
+        st.session_state["menu"] = "Home"
+        reset_feed()
+
+
 def handle_update_item_status(item_id: str, new_status: str):
     """Handle updating item status"""
     utils.update_item_status(item_id, new_status)
-    st.rerun()
+
+
+def handle_confirm_delete(item_id: str, confirm: bool):
+    """Show or dismiss the delete confirmation of an item"""
+    st.session_state[f"confirm_del_{item_id}"] = confirm
 
 
 def handle_delete_item(item_id: str):
     """Handle deleting an item"""
     utils.delete_item(item_id)
-    st.rerun()
+    st.session_state.pop(f"confirm_del_{item_id}", None)
+
+
+def handle_my_items_page(page: int):
+    """Move the My Items list to another page"""
+    st.session_state["my_items_page"] = max(1, page)
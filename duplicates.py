@@ -0,0 +1,47 @@
+"""
+Near-duplicate post detection for the Lost & Found Platform
+
+Every item carries `duplicate_keys`, computed when it is saved: the
+content-addressed ref of its image, plus locality-sensitive hashing (LSH)
+bands of its description MinHash signature. Two posts with the same image, or
+with similar descriptions, share at least one key with high probability, so
+candidates are found with one indexed `$in` lookup. Each candidate is then
+confirmed with a full signature comparison.
+"""
+
+import hashlib
+
+import matching
+
+ROWS_PER_BAND = 4
+BANDS = matching.SIGNATURE_SIZE // ROWS_PER_BAND
+# Estimated description similarity above which two posts count as the same
+SIMILARITY = 0.8
+
+
+def _band_key(index: int, band) -> str:
+    digest = hashlib.blake2b(",".join(map(str, band)).encode(), digest_size=8).hexdigest()
+    return f"lsh:{index}:{digest}"
+
+
+def duplicate_keys(item) -> list:
+    """Lookup keys of an item; needs description_minhash (see matching.match_fields)"""
+    keys = []
+    ref = (item.get("image") or {}).get("ref")
+    if ref:
+        keys.append(f"img:{ref}")
+    signature = item.get("description_minhash") or []
+    if len(signature) == matching.SIGNATURE_SIZE:
+        for i in range(BANDS):
+            keys.append(_band_key(i, signature[i * ROWS_PER_BAND:(i + 1) * ROWS_PER_BAND]))
+    return keys
+
+
+def is_duplicate(item, candidate) -> bool:
+    """True if candidate shows the same image as item or describes it near-identically"""
+    ref = (item.get("image") or {}).get("ref")
+    if ref and ref == (candidate.get("image") or {}).get("ref"):
+        return True
+    similarity = matching.signature_similarity(
+        item.get("description_minhash"), candidate.get("description_minhash"))
+    return similarity >= SIMILARITY
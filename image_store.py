@@ -0,0 +1,180 @@
+"""
+Content-addressed image storage for the Lost & Found Platform
+
+Image bytes live outside the item documents. Each blob is keyed by the
+SHA-256 of its content, so identical uploads are stored exactly once and
+items only keep a small reference ({"ref", "content_type", "size"}).
+"""
+
+import io
+import os
+import hashlib
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+import gridfs
+from gridfs.errors import FileExists, NoFile
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; originals are served instead of thumbnails
+    Image = None
+
+THUMBNAILS_AVAILABLE = Image is not None
+
+
+def content_key(data: bytes) -> str:
+    """Return the content address (SHA-256 hex digest) of a blob"""
+    return hashlib.sha256(data).hexdigest()
+
+
+class ImageStore(ABC):
+    """Base image store interface"""
+
+    @abstractmethod
+    def put(self, data: bytes, content_type: str) -> str:
+        """Store bytes if not already present and return their key"""
+
+    @abstractmethod
+    def get(self, key: str):
+        """Return the stored bytes for key, or None if missing"""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Return whether a blob is stored under key"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Remove the blob stored under key, if any"""
+
+
+class LocalImageStore(ImageStore):
+    """Stores blobs on the local filesystem under root/<key[:2]>/<key>"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, key[:2], key)
+
+    def put(self, data: bytes, content_type: str) -> str:
+        key = content_key(data)
+        path = self._path(key)
+        if os.path.exists(path):
+            return key
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temp file first so readers never see a partial blob
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return key
+
+    def get(self, key: str):
+        try:
+            with open(self._path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+
+class GridFSImageStore(ImageStore):
+    """Stores blobs in a GridFS bucket, using the content key as the file _id"""
+
+    def __init__(self, db, bucket: str = "images"):
+        self.fs = gridfs.GridFS(db, collection=bucket)
+
+    def put(self, data: bytes, content_type: str) -> str:
+        key = content_key(data)
+        if self.fs.exists(key):
+            return key
+        try:
+            self.fs.put(data, _id=key, content_type=content_type)
+        except FileExists:
+            # Another request stored the same image first
+            pass
+        return key
+
+    def get(self, key: str):
+        try:
+            return self.fs.get(key).read()
+        except NoFile:
+            return None
+
+    def exists(self, key: str) -> bool:
+        return self.fs.exists(key)
+
+    def delete(self, key: str) -> None:
+        self.fs.delete(key)
+
+
+# =============================================
+# Thumbnails
+# =============================================
+
+def make_thumbnail(data: bytes, max_side: int):
+    """Downscale an image so its longest side is at most max_side pixels.
+
+    Returns the encoded thumbnail bytes, or None if the image is already small
+    enough (or Pillow is unavailable) and the original should be used as is.
+    """
+    if Image is None:
+        return None
+    with Image.open(io.BytesIO(data)) as img:
+        if max(img.size) <= max_side:
+            return None
+        # Keep the original format so the stored content type stays accurate
+        is_png = img.format == "PNG"
+        img.thumbnail((max_side, max_side))
+        out = io.BytesIO()
+        if is_png:
+            img.save(out, format="PNG", optimize=True)
+        else:
+            img.convert("RGB").save(out, format="JPEG", quality=85, optimize=True)
+        return out.getvalue()
+
+
+class BlobCache:
+    """Thread-safe LRU cache of blobs bounded by their total size in bytes"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            data = self._data.get(key)
+            if data is not None:
+                self._data.move_to_end(key)
+            return data
+
+    def put(self, key: str, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                return
+            self._data[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self._size -= len(evicted)
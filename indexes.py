@@ -0,0 +1,121 @@
+"""
+Index management for the Lost & Found Platform
+
+INDEXES declares every index the queries rely on. apply_indexes creates them
+idempotently (optionally dropping undeclared ones) and index_usage reports
+how often each index has been used, via $indexStats.
+"""
+
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import OperationFailure
+
+import search
+
+INDEXES = {
+    "users": [
+        IndexModel([("username", ASCENDING)], name="username_unique", unique=True),
+    ],
+    "items": [
+        # update_item_status / delete_item / get_item_image look items up by id
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        # Listing sorts are (created_at, id) so keyset pagination has a unique order
+        # Unfiltered home page: newest first
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        # Home page filters (equality on status/type/category), sorted by recency
+        IndexModel(
+            [("status", ASCENDING), ("type", ASCENDING), ("category", ASCENDING),
+             ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="status_type_category_created_at_id"
+        ),
+        # My Items: one owner's listings, newest first
+        IndexModel([("owner", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+                   name="owner_created_at_id"),
+        IndexModel(
+            [(field, TEXT) for field in search.FIELD_WEIGHTS],
+            name="items_text",
+            weights=search.FIELD_WEIGHTS
+        ),
+        IndexModel([("search_tokens", ASCENDING)], name="search_tokens"),
+        # Matching candidates: same category, opposite type, open, nearby date buckets
+        IndexModel(
+            [("category", ASCENDING), ("type", ASCENDING), ("status", ASCENDING),
+             ("match_bucket", ASCENDING)],
+            name="category_type_status_match_bucket"
+        ),
+        # Near-duplicate checks against the poster's own items
+        IndexModel([("owner", ASCENDING), ("duplicate_keys", ASCENDING)], name="owner_duplicate_keys"),
+        # Reference checks before an image blob is deleted
+        IndexModel([("image.ref", ASCENDING)], name="image_ref", sparse=True),
+    ],
+    "matches": [
+        IndexModel([("lost_id", ASCENDING), ("found_id", ASCENDING)], name="lost_found_unique", unique=True),
+        IndexModel([("found_id", ASCENDING)], name="found_id"),
+    ],
+    "sessions": [
+        IndexModel([("token", ASCENDING)], name="token_unique", unique=True),
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ],
+}
+
+
+def _key_of(spec) -> tuple:
+    return tuple((field, value) for field, value in spec.items())
+
+
+def apply_indexes(db, prune: bool = False) -> dict:
+    """Create all declared indexes; with prune, drop undeclared ones.
+
+    Existing indexes with the same keys are left alone even if their name
+    differs, so this is safe to run on every deploy. Without prune, indexes
+    that are no longer declared (e.g. the old name of a renamed index) are
+    kept and listed under "undeclared". Returns a report of
+    {"created": [...], "dropped": [...], "undeclared": [...], "errors": [...]}.
+    """
+    report = {"created": [], "dropped": [], "undeclared": [], "errors": []}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        existing = collection.index_information()
+        existing_keys = {_key_of(dict(info["key"])): name for name, info in existing.items()}
+        declared_names = set()
+
+        for model in models:
+            doc = model.document
+            key = _key_of(doc["key"])
+            # Text indexes are reported by index_information with internal keys
+            if any(value == TEXT for _, value in key):
+                match = doc["name"] if doc["name"] in existing else None
+            else:
+                match = existing_keys.get(key)
+            if match is not None:
+                declared_names.add(match)
+                continue
+            try:
+                collection.create_indexes([model])
+                declared_names.add(doc["name"])
+                report["created"].append(f"{collection_name}.{doc['name']}")
+            except OperationFailure as e:
+                report["errors"].append(f"{collection_name}.{doc['name']}: {e}")
+
+        for name in existing:
+            if name != "_id_" and name not in declared_names:
+                if prune:
+                    collection.drop_index(name)
+                    report["dropped"].append(f"{collection_name}.{name}")
+                else:
+                    report["undeclared"].append(f"{collection_name}.{name}")
+    return report
+
+
+def index_usage(db) -> list:
+    """Return per-index usage counters from $indexStats for all declared collections"""
+    usage = []
+    for collection_name in INDEXES:
+        for stat in db[collection_name].aggregate([{"$indexStats": {}}]):
+            usage.append({
+                "collection": collection_name,
+                "name": stat["name"],
+                "ops": stat["accesses"]["ops"],
+                "since": stat["accesses"]["since"],
+            })
+    usage.sort(key=lambda u: (u["collection"], -u["ops"]))
+    return usage
@@ -0,0 +1,207 @@
+"""
+Incrementally maintained in-memory snapshot of the items collection
+
+An ItemSnapshot loads the listings once, then applies inserts, updates and
+deletes as they happen, so page renders can read listings without a database
+round-trip. Changes arrive through a MongoDB change stream when the server
+supports it (replica sets / Atlas); otherwise a polling loop picks up new
+items by `created_at` and reconciles status changes and deletions.
+"""
+
+import threading
+from datetime import datetime
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+# Change streams are only available on replica sets and sharded clusters
+_CHANGE_STREAM_UNSUPPORTED = {40573, 40324}
+
+
+def _naive_utc(value):
+    """pymongo returns naive UTC datetimes; normalise locally created ones to match"""
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        return value.replace(tzinfo=None) - value.utcoffset()
+    return value
+
+
+class ItemSnapshot:
+    """Id-keyed in-memory copy of the items collection kept current in the background"""
+
+    def __init__(self, collection, projection=None, mode: str = "changestream",
+                 poll_interval: float = 5.0, factory=None):
+        self.collection = collection
+        self.projection = dict(projection or {})
+        self.projection.pop("_id", None)
+        self.mode = mode
+        self.poll_interval = poll_interval
+        self.factory = factory  # builds the records items() returns, e.g. Item.from_dict
+        self._items = {}       # item id -> item dict (without _id)
+        self._oids = {}        # Mongo _id -> item id, to resolve delete events
+        self._sorted = None    # items ordered by created_at, rebuilt lazily
+        self._last_created_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._ready = threading.Event()
+        self._thread = None
+
+    # ---------------------------------------------
+    # Public API
+    # ---------------------------------------------
+
+    def start(self) -> None:
+        """Start the background watcher thread (idempotent)"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="item-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def wait_ready(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def items(self) -> list:
+        """Return all items ordered by created_at (oldest first), like load_items"""
+        with self._lock:
+            if self._sorted is None:
+                ordered = sorted(
+                    self._items.values(),
+                    key=lambda item: item.get("created_at") or datetime.min
+                )
+                self._sorted = [self.factory(item) for item in ordered] if self.factory else ordered
+            return self._sorted
+
+    def upsert(self, item: dict, oid=None) -> None:
+        """Apply an inserted or replaced item"""
+        # Keep locally applied items in the same shape as projected reads
+        item = {k: v for k, v in item.items() if k != "_id" and self.projection.get(k, 1) != 0}
+        if "created_at" in item:
+            item["created_at"] = _naive_utc(item["created_at"])
+        image = item.get("image")
+        if "image.data" in self.projection and isinstance(image, dict) and "data" in image:
+            item["image"] = {k: v for k, v in image.items() if k != "data"}
+        with self._lock:
+            self._items[item["id"]] = item
+            if oid is not None:
+                self._oids[oid] = item["id"]
+            created_at = item.get("created_at")
+            if created_at is not None and (self._last_created_at is None or created_at > self._last_created_at):
+                self._last_created_at = created_at
+            self._sorted = None
+
+    def update(self, item_id, fields: dict) -> None:
+        """Apply an update to the top-level fields of an item"""
+        with self._lock:
+            current = self._items.get(item_id)
+            if current is None:
+                return
+            updated = dict(current)
+            for key, value in fields.items():
+                if "." in key:
+                    head, rest = key.split(".", 1)
+                    nested = dict(updated.get(head) or {})
+                    nested[rest] = value
+                    updated[head] = nested
+                else:
+                    updated[key] = value
+            self._items[item_id] = updated
+            self._sorted = None
+
+    def remove(self, item_id) -> None:
+        with self._lock:
+            if self._items.pop(item_id, None) is not None:
+                self._sorted = None
+
+    # ---------------------------------------------
+    # Background loop
+    # ---------------------------------------------
+
+    def _run(self) -> None:
+        backoff = 1.0
+        while not self._stop.is_set():
+            try:
+                if self.mode == "changestream":
+                    self._watch_change_stream()
+                else:
+                    self._load_all()
+                    self._ready.set()
+                    backoff = 1.0
+                    self._poll()
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAM_UNSUPPORTED and self.mode == "changestream":
+                    print("⚠️ Change streams unavailable, item watcher falling back to polling")
+                    self.mode = "poll"
+                    continue
+                print(f"⚠️ Item watcher error: {e}")
+            except PyMongoError as e:
+                print(f"⚠️ Item watcher error: {e}")
+            self._stop.wait(backoff)
+            backoff = min(backoff * 2, 60.0)
+
+    def _load_all(self) -> None:
+        projection = dict(self.projection, _id=1)
+        items, oids, last_created_at = {}, {}, None
+        for doc in self.collection.find({}, projection):
+            oid = doc.pop("_id")
+            items[doc["id"]] = doc
+            oids[oid] = doc["id"]
+            created_at = doc.get("created_at")
+            if created_at is not None and (last_created_at is None or created_at > last_created_at):
+                last_created_at = created_at
+        with self._lock:
+            self._items, self._oids = items, oids
+            self._last_created_at = last_created_at
+            self._sorted = None
+
+    def _watch_change_stream(self) -> None:
+        pipeline = [{"$project": {"fullDocument.image.data": 0}}] if "image.data" in self.projection else []
+        with self.collection.watch(pipeline, full_document="updateLookup") as stream:
+            # Load after opening the stream so no change falls between the two
+            self._load_all()
+            self._ready.set()
+            while not self._stop.is_set():
+                change = stream.try_next()
+                if change is None:
+                    continue
+                op = change["operationType"]
+                oid = change.get("documentKey", {}).get("_id")
+                if op in ("insert", "replace", "update"):
+                    doc = change.get("fullDocument")
+                    if doc is not None:
+                        self.upsert(doc, oid=oid)
+                elif op == "delete":
+                    with self._lock:
+                        item_id = self._oids.pop(oid, None)
+                    if item_id is not None:
+                        self.remove(item_id)
+                elif op in ("drop", "rename", "invalidate"):
+                    return
+
+    def _poll(self) -> None:
+        while not self._stop.wait(self.poll_interval):
+            # New items since the last one seen
+            query = {}
+            if self._last_created_at is not None:
+                query["created_at"] = {"$gt": self._last_created_at}
+            for doc in self.collection.find(query, dict(self.projection, _id=1)):
+                self.upsert(doc, oid=doc.pop("_id"))
+
+            # Status changes, deletions and late arrivals, from a light id/status sweep
+            seen, missing = set(), []
+            for doc in self.collection.find({}, {"_id": 0, "id": 1, "status": 1}):
+                seen.add(doc["id"])
+                current = self._items.get(doc["id"])
+                if current is None:
+                    missing.append(doc["id"])
+                elif current.get("status") != doc.get("status"):
+                    self.update(doc["id"], {"status": doc.get("status")})
+            if missing:
+                for doc in self.collection.find({"id": {"$in": missing}}, dict(self.projection, _id=1)):
+                    self.upsert(doc, oid=doc.pop("_id"))
+            for item_id in [i for i in list(self._items) if i not in seen]:
+                self.remove(item_id)
@@ -0,0 +1,134 @@
+"""
+Columnar listing index for the Lost & Found Platform
+
+Listings filtered in memory (item snapshot, demo/offline mode) are encoded
+once per listing list into NumPy columns: type, status and category as small
+integer codes and dates as day ordinals. Each filter then becomes a boolean
+mask and all of them are evaluated in one vectorised pass, instead of a
+Python loop over every item.
+"""
+
+import json
+import threading
+from datetime import datetime
+
+import numpy as np
+
+import cache
+from models import ITEM_TYPES, ITEM_STATUSES, CATEGORIES
+
+_TYPE_CODES = {value: code for code, value in enumerate(ITEM_TYPES)}
+_STATUS_CODES = {value: code for code, value in enumerate(ITEM_STATUSES)}
+_CATEGORY_CODES = {value: code for code, value in enumerate(CATEGORIES)}
+
+UNKNOWN = -1    # stored value outside the known vocabulary
+NO_MATCH = -2   # filter value outside the vocabulary: matches nothing
+NO_DATE = -1    # missing or unparseable date: never excluded by a date range
+MEMO_SIZE = 64  # filter signatures remembered per encoding, least recently used dropped
+
+
+def _encode(values, codes: dict) -> np.ndarray:
+    return np.fromiter((codes.get(v, UNKNOWN) for v in values), dtype=np.int8, count=len(values))
+
+
+def _day_ordinal(item) -> int:
+    value = item.date_value
+    if value is None:
+        try:
+            value = datetime.strptime(item.date, "%Y-%m-%d")
+        except (TypeError, ValueError):
+            return NO_DATE
+    return value.toordinal()
+
+
+class ListingColumns:
+    """Column-encoded view of a list of models.Item records, in list order"""
+
+    def __init__(self, items: list):
+        self.size = len(items)
+        self.types = _encode([item.type for item in items], _TYPE_CODES)
+        self.statuses = _encode([item.status for item in items], _STATUS_CODES)
+        self.categories = _encode([item.category for item in items], _CATEGORY_CODES)
+        self.days = np.fromiter((_day_ordinal(item) for item in items), dtype=np.int32, count=self.size)
+        self.positions = {item.id: i for i, item in enumerate(items)}
+        # (kind, filter signature) -> result, valid for this encoding
+        self._memo = cache.TTLCache(maxsize=MEMO_SIZE, ttl=float("inf"))
+
+    def mask(self, filter_type: str = "All", filter_status: str = "All",
+             filter_category: str = "All", date_from=None, date_to=None,
+             ids=None) -> np.ndarray:
+        """Boolean mask of the rows matching every filter; ids restricts to those item ids"""
+        mask = np.ones(self.size, dtype=bool)
+        if filter_type != "All":
+            mask &= self.types == _TYPE_CODES.get(filter_type, NO_MATCH)
+        if filter_status != "All":
+            mask &= self.statuses == _STATUS_CODES.get(filter_status, NO_MATCH)
+        if filter_category != "All":
+            mask &= self.categories == _CATEGORY_CODES.get(filter_category, NO_MATCH)
+        if date_from and date_to:
+            days = self.days
+            mask &= (days == NO_DATE) | ((days >= date_from.toordinal()) & (days <= date_to.toordinal()))
+        if ids is not None:
+            selected = np.zeros(self.size, dtype=bool)
+            selected[[self.positions[i] for i in ids if i in self.positions]] = True
+            mask &= selected
+        return mask
+
+    def facets(self, filters: dict, ids=None) -> dict:
+        """Per-option counts of type, status and category under the given filters.
+
+        Each dimension is counted under every filter except its own, so an
+        option's count is the number of results selecting it would give.
+        filters is the listing filter dict (search_term included, for the
+        cache signature); ids are the search hits, if searching. Returns
+        {"type": {"All": n, "Lost": n, ...}, "status": {...}, "category": {...}}.
+        """
+        return self.memoize("facets", filters, lambda: self._facets(filters, ids))
+
+    def memoize(self, kind: str, filters: dict, compute):
+        """Return compute() cached under the filter signature until the listings change"""
+        key = (kind, json.dumps(filters, sort_keys=True, default=str))
+        result = self._memo.get(key)
+        if result is None:
+            result = compute()
+            self._memo.set(key, result)
+        return result
+
+    def _facets(self, filters: dict, ids) -> dict:
+        base = self.mask(date_from=filters.get("date_from"), date_to=filters.get("date_to"), ids=ids)
+        dimensions = {
+            "type": (self.types, ITEM_TYPES, self.mask(filter_type=filters.get("filter_type", "All"))),
+            "status": (self.statuses, ITEM_STATUSES, self.mask(filter_status=filters.get("filter_status", "All"))),
+            "category": (self.categories, CATEGORIES,
+                         self.mask(filter_category=filters.get("filter_category", "All"))),
+        }
+        result = {}
+        for name, (column, vocabulary, _) in dimensions.items():
+            selected = base.copy()
+            for other, (_, _, own_mask) in dimensions.items():
+                if other != name:
+                    selected &= own_mask
+            codes = column[selected]
+            counts = np.bincount(codes[codes >= 0], minlength=len(vocabulary))
+            result[name] = {"All": int(selected.sum()), **dict(zip(vocabulary, counts.tolist()))}
+        return result
+
+
+_columns = None          # (items list, ListingColumns) for the last list encoded
+_columns_lock = threading.Lock()
+
+
+def get_columns(items: list) -> ListingColumns:
+    """Return the columns of items, re-encoding only when a different list is passed.
+
+    The item snapshot and the listing cache hand out the same list object
+    until the listings change, so repeated filtering reuses one encoding.
+    """
+    global _columns
+    with _columns_lock:
+        if _columns is not None and _columns[0] is items:
+            return _columns[1]
+    columns = ListingColumns(items)
+    with _columns_lock:
+        _columns = (items, columns)
+    return columns
@@ -0,0 +1,177 @@
+"""
+Maintenance commands for the Lost & Found Platform
+
+Usage:
+    python manage.py ensure-indexes [--prune]
+    python manage.py index-stats
+    python manage.py migrate-images
+    python manage.py backfill-fields
+    python manage.py match-items
+    python manage.py import-items data/items.json [--image-root .]
+    python manage.py import-users data/users.json
+    python manage.py export-items items.ndjson [--format ndjson|json]
+"""
+
+import argparse
+import sys
+import time
+
+import bulk_io
+import indexes
+import utils
+
+
+def cmd_ensure_indexes(args):
+    """Create the declared indexes, optionally dropping undeclared ones"""
+    report = utils.ensure_indexes(prune=args.prune)
+    if report is None:
+        return 1
+    for name in report["created"]:
+        print(f"+ created {name}")
+    for name in report["dropped"]:
+        print(f"- dropped {name}")
+    for name in report["undeclared"]:
+        print(f"? kept {name} (no longer declared; pass --prune to drop it)")
+    if report["errors"]:
+        return 1
+    print("✓ Indexes are up to date.")
+
+
+def cmd_index_stats(args):
+    """Print how often each index has been used since the server started"""
+    db = utils.get_db()
+    if db is None:
+        print("⚠️ Database connection failed")
+        return 1
+    for usage in indexes.index_usage(db):
+        unused = "  (unused)" if usage["ops"] == 0 else ""
+        print(f"{usage['collection']:<10} {usage['name']:<34} {usage['ops']:>10} ops since {usage['since']:%Y-%m-%d %H:%M}{unused}")
+
+
+def cmd_migrate_images(args):
+    """Move embedded base64 images into the configured image store"""
+    migrated = utils.migrate_embedded_images(batch_size=args.batch_size)
+    print(f"✓ Migrated {migrated} embedded image(s) to the {utils.IMAGE_STORE_BACKEND} image store.")
+
+
+def cmd_backfill_fields(args):
+    """Compute the precomputed date, search and matching fields on existing items"""
+    updated = utils.backfill_derived_fields(batch_size=args.batch_size)
+    print(f"✓ Backfilled date, search and matching fields on {updated} item(s).")
+
+
+def cmd_match_items(args):
+    """Match every open Lost item against open Found items"""
+    stored = utils.match_all_items(batch_size=args.batch_size)
+    print(f"✓ Stored {stored} Lost/Found match(es).")
+
+
+def _open(path, mode):
+    if path == "-":
+        return open(sys.stdout.fileno() if "w" in mode else sys.stdin.fileno(),
+                     mode, encoding="utf-8", closefd=False)
+    return open(path, mode, encoding="utf-8")
+
+
+def _progress(noun, started):
+    """on_batch callback printing running totals and throughput on one line"""
+    def report(stats):
+        done = sum(stats.values())
+        rate = done / max(time.perf_counter() - started, 1e-9)
+        print(f"\r  {done:,} {noun} processed ({stats['inserted']:,} inserted, "
+              f"{stats['skipped']:,} skipped) — {rate:,.0f} {noun}/s", end="", flush=True)
+    return report
+
+
+def _import(noun, import_fn, args, **kwargs):
+    started = time.perf_counter()
+    with _open(args.path, "r") as f:
+        stats = import_fn(bulk_io.iter_records(f), batch_size=args.batch_size,
+                          on_batch=_progress(noun, started), **kwargs)
+    elapsed = time.perf_counter() - started
+    print(f"\n✓ Imported {stats['inserted']:,} {noun} in {elapsed:.1f}s "
+          f"({stats['skipped']:,} already present, {stats['failed']:,} failed).")
+    return 1 if stats["failed"] else None
+
+
+def cmd_import_items(args):
+    """Stream items from a JSON array or NDJSON file into the items collection"""
+    return _import("items", utils.import_items, args, image_root=args.image_root)
+
+
+def cmd_import_users(args):
+    """Stream users from a JSON/NDJSON file or the legacy users.json mapping"""
+    return _import("users", utils.import_users, args)
+
+
+def cmd_export_items(args):
+    """Stream every item to an NDJSON or JSON file"""
+    fmt = args.format or ("json" if args.path.endswith(".json") else "ndjson")
+    started = time.perf_counter()
+
+    # Progress goes to stderr so exporting to stdout stays clean
+    def with_progress(items):
+        for n, item in enumerate(items, 1):
+            if n % args.batch_size == 0:
+                rate = n / max(time.perf_counter() - started, 1e-9)
+                print(f"\r  {n:,} items exported — {rate:,.0f} items/s", end="", file=sys.stderr, flush=True)
+            yield item
+
+    with _open(args.path, "w") as f:
+        items = with_progress(utils.iter_export_items(batch_size=args.batch_size))
+        written = bulk_io.write_records(items, f, fmt)
+    elapsed = time.perf_counter() - started
+    print(f"\n✓ Exported {written:,} item(s) in {elapsed:.1f}s "
+          f"({written / max(elapsed, 1e-9):,.0f} items/s).", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lost & Found maintenance commands")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ensure = subparsers.add_parser("ensure-indexes", help="Create the declared collection indexes")
+    ensure.add_argument("--prune", action="store_true", help="Drop indexes that are no longer declared")
+    ensure.set_defaults(func=cmd_ensure_indexes)
+
+    stats = subparsers.add_parser("index-stats", help="Show index usage from $indexStats")
+    stats.set_defaults(func=cmd_index_stats)
+
+    migrate = subparsers.add_parser("migrate-images", help="Move embedded images into the image store")
+    migrate.add_argument("--batch-size", type=int, default=100)
+    migrate.set_defaults(func=cmd_migrate_images)
+
+    backfill = subparsers.add_parser(
+        "backfill-fields", aliases=["reindex-search"],
+        help="Backfill precomputed date, search and matching fields on existing items"
+    )
+    backfill.add_argument("--batch-size", type=int, default=500)
+    backfill.set_defaults(func=cmd_backfill_fields)
+
+    match = subparsers.add_parser("match-items", help="Match all open Lost and Found items")
+    match.add_argument("--batch-size", type=int, default=500)
+    match.set_defaults(func=cmd_match_items)
+
+    import_items = subparsers.add_parser("import-items", help="Bulk import items from JSON or NDJSON")
+    import_items.add_argument("path", help="JSON array or NDJSON file, or - for stdin")
+    import_items.add_argument("--batch-size", type=int, default=500)
+    import_items.add_argument("--image-root", default=".", help="Directory image_path values are relative to")
+    import_items.set_defaults(func=cmd_import_items)
+
+    import_users = subparsers.add_parser("import-users", help="Bulk import users from JSON or NDJSON")
+    import_users.add_argument("path", help="JSON/NDJSON file or legacy users.json, or - for stdin")
+    import_users.add_argument("--batch-size", type=int, default=500)
+    import_users.set_defaults(func=cmd_import_users)
+
+    export = subparsers.add_parser("export-items", help="Stream all items to NDJSON or JSON")
+    export.add_argument("path", help="Output file, or - for stdout")
+    export.add_argument("--format", choices=bulk_io.FORMATS,
+                        help="Defaults to json for .json paths, ndjson otherwise")
+    export.add_argument("--batch-size", type=int, default=1000)
+    export.set_defaults(func=cmd_export_items)
+
+    args = parser.parse_args(argv)
+    return args.func(args) or 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Lost ↔ Found matching for the Lost & Found Platform
+
+A new item is scored against open items of the opposite type. Candidates are
+found through blocking keys instead of a scan: only items in the same category
+whose date falls in a nearby week bucket (`match_bucket`) are considered.
+Each candidate is scored on date proximity, location token overlap and
+description similarity, the latter estimated from MinHash signatures that
+are computed once when an item is saved (`description_minhash`).
+"""
+
+import math
+import random
+import hashlib
+
+import search
+
+SIGNATURE_SIZE = 64
+BUCKET_DAYS = 7
+WINDOW_DAYS = 14        # items further apart than this never match
+MIN_SCORE = 0.35
+WEIGHTS = {"date": 0.3, "location": 0.3, "description": 0.4}
+
+OPPOSITE_TYPE = {"Lost": "Found", "Found": "Lost"}
+
+# Fixed seed: signatures are stored, so every process must use the same permutations
+_PRIME = (1 << 61) - 1
+_rng = random.Random(1729)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(SIGNATURE_SIZE)]
+
+
+def shingles(text) -> set:
+    """Words and consecutive word pairs of text, normalised like search tokens"""
+    words = search.tokenize(text)
+    return set(words) | {f"{a} {b}" for a, b in zip(words, words[1:])}
+
+
+def minhash(features) -> list:
+    """MinHash signature of a feature set; empty sets give an empty signature"""
+    if not features:
+        return []
+    hashes = [int.from_bytes(hashlib.blake2b(f.encode(), digest_size=8).digest(), "big") for f in features]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def signature_similarity(sig_a, sig_b) -> float:
+    """Estimated Jaccard similarity of the sets behind two MinHash signatures"""
+    if not sig_a or not sig_b or len(sig_a) != len(sig_b):
+        return 0.0
+    return sum(1 for a, b in zip(sig_a, sig_b) if a == b) / len(sig_a)
+
+
+def date_bucket(date_value):
+    """Blocking bucket of an item date (a datetime), or None without a date"""
+    if date_value is None:
+        return None
+    return date_value.toordinal() // BUCKET_DAYS
+
+
+def candidate_buckets(bucket: int) -> list:
+    """Buckets that can hold items within WINDOW_DAYS of any date in bucket"""
+    span = math.ceil(WINDOW_DAYS / BUCKET_DAYS)
+    return list(range(bucket - span, bucket + span + 1))
+
+
+def match_fields(item) -> dict:
+    """Blocking key and description signature, precomputed when an item is saved"""
+    return {
+        "match_bucket": date_bucket(item.get("date_value")),
+        "description_minhash": minhash(shingles(item.get("description"))),
+    }
+
+
+def score(item, candidate):
+    """Score two items of the same category in [0, 1], or None if they cannot match.
+
+    Both need date_value, location and description_minhash.
+    """
+    if item.get("date_value") is None or candidate.get("date_value") is None:
+        return None
+    days = abs((item["date_value"] - candidate["date_value"]).days)
+    if days > WINDOW_DAYS:
+        return None
+    locations = set(search.tokenize(item.get("location"))), set(search.tokenize(candidate.get("location")))
+    union = locations[0] | locations[1]
+    total = (
+        WEIGHTS["date"] * (1 - days / WINDOW_DAYS)
+        + WEIGHTS["location"] * (len(locations[0] & locations[1]) / len(union) if union else 0.0)
+        + WEIGHTS["description"] * signature_similarity(
+            item.get("description_minhash"), candidate.get("description_minhash"))
+    )
+    return round(total, 4) if total >= MIN_SCORE else None
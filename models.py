@@ -61,10 +61,26 @@ PRIMARY_COLOR = "#6c63ff"
 PRIMARY_HOVER = "#5a52d5"
 
 
+# Fields stored on every item document, in to_dict order
+ITEM_FIELDS = ("id", "title", "type", "category", "description", "location",
+               "date", "image", "owner", "status")
+# Fields set by the data layer (created_at, date_value) or a text search (score)
+ITEM_META_FIELDS = ("created_at", "date_value", "score")
+
+
 class Item:
-    """Item model"""
-    def __init__(self, id, title, itype, category, description, location, date, 
-                 image=None, owner=None, status="Active"):
+    """Item model.
+
+    A __slots__ record rather than a dict: listings hold thousands of these,
+    and filters read them by attribute. Read-only mapping access
+    (item["title"], item.get("status")) is kept for templates and callers
+    that still treat items as documents.
+    """
+    __slots__ = ITEM_FIELDS + ITEM_META_FIELDS
+
+    def __init__(self, id, title, itype, category, description, location, date,
+                 image=None, owner=None, status="Active", created_at=None,
+                 date_value=None, score=None):
         self.id = id
         self.title = title
         self.type = itype
@@ -75,55 +91,67 @@ class Item:
         self.image = image
         self.owner = owner
         self.status = status
+        self.created_at = created_at
+        self.date_value = date_value
+        self.score = score
+
+    def __repr__(self):
+        return f"Item(id={self.id!r}, title={self.title!r}, type={self.type!r}, status={self.status!r})"
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __contains__(self, key):
+        return key in self.__slots__ and getattr(self, key) is not None
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None)
+        return default if value is None else value
 
     def to_dict(self):
-        return {
-            "id": self.id,
-            "title": self.title,
-            "type": self.type,
-            "category": self.category,
-            "description": self.description,
-            "location": self.location,
-            "date": self.date,
-            "image": self.image,
-            "owner": self.owner,
-            "status": self.status,
-        }
+        data = {field: getattr(self, field) for field in ITEM_FIELDS}
+        for field in ITEM_META_FIELDS:
+            value = getattr(self, field)
+            if value is not None:
+                data[field] = value
+        return data
 
     @staticmethod
     def from_dict(data):
+        """Build an Item from a document, ignoring fields it has no slot for (_id, search_tokens)"""
+        get = data.get
         return Item(
-            id=data.get("id"),
-            title=data.get("title"),
-            itype=data.get("type"),
-            category=data.get("category"),
-            description=data.get("description"),
-            location=data.get("location"),
-            date=data.get("date"),
-            image=data.get("image"),
-            owner=data.get("owner"),
-            status=data.get("status", "Active"),
+            get("id"), get("title"), get("type"),
+            # Documents saved without these count as Active / Other everywhere
+            get("category") or "Other", get("description"), get("location"), get("date"),
+            get("image"), get("owner"), get("status") or "Active",
+            get("created_at"), get("date_value"), get("score"),
         )
 
 
 class User:
     """User model"""
-    def __init__(self, username, password_hash=None, contact=None):
+    __slots__ = ("username", "password", "contact_info")
+
+    def __init__(self, username, password=None, contact_info=None):
         self.username = username
-        self.password_hash = password_hash
-        self.contact = contact
+        self.password = password  # stored hash, see passwords.py
+        self.contact_info = contact_info
 
     def to_dict(self):
         return {
             "username": self.username,
-            "password_hash": self.password_hash,
-            "contact": self.contact,
+            "password": self.password,
+            "contact_info": self.contact_info,
         }
 
     @staticmethod
     def from_dict(data):
         return User(
             username=data.get("username"),
-            password_hash=data.get("password_hash"),
-            contact=data.get("contact"),
+            password=data.get("password"),
+            contact_info=data.get("contact_info"),
         )
@@ -0,0 +1,168 @@
+"""
+Password hashing for the Lost & Found Platform
+
+Hashes are computed on a bounded worker pool so a burst of logins cannot
+pile up unbounded key-derivation work. hashlib releases the GIL while
+deriving keys, so a thread pool runs hashes in parallel; a process pool can
+be selected instead.
+
+Stored formats:
+    pbkdf2_sha256$<iterations>$<salt>$<hex>     current PBKDF2 format
+    scrypt$<n>$<r>$<p>$<salt>$<hex>             current scrypt format
+    <salt>$<hex>                                legacy PBKDF2 (100k iterations)
+    <hex>                                       legacy unsalted SHA-256
+Any hash not in the configured algorithm/parameters is reported by
+needs_rehash so callers can upgrade it transparently on login.
+"""
+
+import os
+import hmac
+import hashlib
+import secrets
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+ALGORITHM = os.getenv("PASSWORD_ALGORITHM", "pbkdf2_sha256")  # or "scrypt"
+PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_ITERATIONS", "100000"))
+SCRYPT_N = int(os.getenv("SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("SCRYPT_P", "1"))
+
+HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "4"))
+HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+HASH_TIMEOUT = float(os.getenv("PASSWORD_HASH_TIMEOUT", "10"))
+HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")  # or "process"
+
+LEGACY_PBKDF2_ITERATIONS = 100000
+
+
+class HashPoolBusy(RuntimeError):
+    """Raised when the hashing queue stays full for longer than HASH_TIMEOUT"""
+
+
+# =============================================
+# Key derivation (run on the worker pool)
+# =============================================
+
+def _derive(params: tuple, password: str, salt: str) -> str:
+    algorithm = params[0]
+    if algorithm == "pbkdf2_sha256":
+        iterations = params[1]
+        return hashlib.pbkdf2_hmac("sha256", password.encode(), salt.encode(), iterations).hex()
+    if algorithm == "scrypt":
+        n, r, p = params[1:]
+        return hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p,
+                              maxmem=128 * n * r * p + 1024 * 1024).hex()
+    raise ValueError(f"Unsupported password algorithm: {algorithm}")
+
+
+def _current_params() -> tuple:
+    if ALGORITHM == "scrypt":
+        return ("scrypt", SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return ("pbkdf2_sha256", PBKDF2_ITERATIONS)
+
+
+def _parse(stored_hash: str):
+    """Return (params, salt, digest) for a stored hash, or None for legacy SHA-256"""
+    parts = stored_hash.split("$")
+    if len(parts) == 1:
+        return None
+    if len(parts) == 2:
+        return ("pbkdf2_sha256", LEGACY_PBKDF2_ITERATIONS), parts[0], parts[1]
+    if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+        return ("pbkdf2_sha256", int(parts[1])), parts[2], parts[3]
+    if parts[0] == "scrypt" and len(parts) == 6:
+        return ("scrypt", int(parts[1]), int(parts[2]), int(parts[3])), parts[4], parts[5]
+    raise ValueError("Unrecognised password hash format")
+
+
+def _format(params: tuple, salt: str, digest: str) -> str:
+    return "$".join([str(p) for p in params] + [salt, digest])
+
+
+# =============================================
+# Worker pool
+# =============================================
+
+class HashPool:
+    """Bounded executor for password hashing with queue-depth metrics"""
+
+    def __init__(self, workers: int, max_queue: int, executor: str = "thread"):
+        pool_cls = ProcessPoolExecutor if executor == "process" else ThreadPoolExecutor
+        self._executor = pool_cls(max_workers=workers)
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pending = 0
+        self.peak_pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def run(self, fn, *args, timeout: float = HASH_TIMEOUT):
+        """Run fn(*args) on the pool and wait for its result"""
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolBusy("Password hashing queue is full")
+        with self._lock:
+            self.pending += 1
+            self.peak_pending = max(self.peak_pending, self.pending)
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            with self._lock:
+                self.pending -= 1
+                self.completed += 1
+            self._slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "pending": self.pending,
+                "queued": max(0, self.pending - self.workers),
+                "peak_pending": self.peak_pending,
+                "completed": self.completed,
+                "rejected": self.rejected,
+            }
+
+
+_pool = HashPool(HASH_WORKERS, HASH_MAX_QUEUE, HASH_EXECUTOR)
+
+
+def pool_stats() -> dict:
+    """Return concurrency and queue-depth metrics of the hashing pool"""
+    return _pool.stats()
+
+
+# =============================================
+# Public API
+# =============================================
+
+def hash_password(password: str, salt: str = None) -> str:
+    """Hash a password with the configured algorithm and parameters"""
+    if salt is None:
+        salt = secrets.token_hex(16)
+    params = _current_params()
+    return _format(params, salt, _pool.run(_derive, params, password, salt))
+
+
+def verify_password(password: str, stored_hash: str) -> bool:
+    """Check a password against any supported stored hash in constant time"""
+    parsed = _parse(stored_hash)
+    if parsed is None:
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, stored_hash)
+    params, salt, digest = parsed
+    candidate = _pool.run(_derive, params, password, salt)
+    return hmac.compare_digest(candidate, digest)
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True if a stored hash does not use the configured algorithm and parameters"""
+    parsed = _parse(stored_hash)
+    if parsed is None or stored_hash.count("$") == 1:
+        return True  # legacy formats
+    return parsed[0] != _current_params()
@@ -0,0 +1,154 @@
+"""
+Full-text search for the Lost & Found Platform
+
+Provides the tokenizer shared by the MongoDB text search path (items store
+their tokens in `search_tokens` at write time) and an in-process inverted
+index used when listings are filtered in memory (demo/offline mode).
+"""
+
+import re
+import math
+import bisect
+import threading
+import unicodedata
+from collections import defaultdict
+
+# Relative importance of each searchable field, mirrored by the Mongo text index
+FIELD_WEIGHTS = {"title": 10, "location": 3, "description": 1}
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize(text) -> str:
+    """Lowercase and ASCII-fold text (Café -> cafe)"""
+    decomposed = unicodedata.normalize("NFKD", str(text).casefold())
+    return decomposed.encode("ascii", "ignore").decode("ascii")
+
+
+def tokenize(text) -> list:
+    """Split text into normalised alphanumeric tokens"""
+    if not text:
+        return []
+    return _TOKEN_RE.findall(normalize(text))
+
+
+def item_tokens(item: dict) -> list:
+    """Return the sorted unique search tokens of an item's searchable fields"""
+    tokens = set()
+    for field in FIELD_WEIGHTS:
+        tokens.update(tokenize(item.get(field, "")))
+    return sorted(tokens)
+
+
+def split_query(search_term: str) -> tuple:
+    """Split a search box value into (complete_terms, prefix_term).
+
+    The last word is treated as a prefix while the user is still typing it,
+    i.e. unless the search term ends with whitespace.
+    """
+    terms = tokenize(search_term)
+    if not terms or search_term[-1:].isspace():
+        return terms, None
+    return terms[:-1], terms[-1]
+
+
+class InvertedIndex:
+    """Weighted inverted index with ranked, prefix-aware AND queries"""
+
+    def __init__(self):
+        self._postings = defaultdict(dict)  # term -> {doc_id: weighted tf}
+        self._doc_terms = {}                # doc_id -> set of terms
+        self._vocabulary = []               # sorted terms, for prefix lookups
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._doc_terms)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._doc_terms
+
+    def add(self, doc_id, item: dict) -> None:
+        """Index (or re-index) the searchable fields of an item"""
+        weights = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS.items():
+            for term in tokenize(item.get(field, "")):
+                weights[term] += weight
+        with self._lock:
+            self._remove_locked(doc_id)
+            for term, weight in weights.items():
+                postings = self._postings[term]
+                if not postings:
+                    bisect.insort(self._vocabulary, term)
+                postings[doc_id] = weight
+            self._doc_terms[doc_id] = set(weights)
+
+    def remove(self, doc_id) -> None:
+        with self._lock:
+            self._remove_locked(doc_id)
+
+    def _remove_locked(self, doc_id) -> None:
+        for term in self._doc_terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.pop(doc_id, None)
+            if not postings:
+                del self._postings[term]
+                idx = bisect.bisect_left(self._vocabulary, term)
+                if idx < len(self._vocabulary) and self._vocabulary[idx] == term:
+                    self._vocabulary.pop(idx)
+
+    def _expand_prefix(self, prefix: str) -> list:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        end = bisect.bisect_left(self._vocabulary, prefix + "\uffff")
+        return self._vocabulary[start:end]
+
+    def search(self, search_term: str) -> dict:
+        """Return {doc_id: score} for documents matching every query term"""
+        complete, prefix = split_query(search_term)
+        groups = [[term] for term in complete]
+        with self._lock:
+            if prefix is not None:
+                groups.append(self._expand_prefix(prefix))
+            if not groups:
+                return {}
+            total_docs = max(1, len(self._doc_terms))
+            scores = None
+            for terms in groups:
+                group_scores = defaultdict(float)
+                for term in terms:
+                    postings = self._postings.get(term)
+                    if not postings:
+                        continue
+                    idf = math.log(1 + total_docs / len(postings))
+                    for doc_id, weight in postings.items():
+                        group_scores[doc_id] += weight * idf
+                if scores is None:
+                    scores = dict(group_scores)
+                else:
+                    scores = {
+                        doc_id: score + group_scores[doc_id]
+                        for doc_id, score in scores.items()
+                        if doc_id in group_scores
+                    }
+                if not scores:
+                    return {}
+            return scores
+
+    def sync(self, items: list) -> None:
+        """Bring the index in line with a list of items, keyed by item id"""
+        current = {item["id"]: item for item in items}
+        with self._lock:
+            stale = [doc_id for doc_id in self._doc_terms if doc_id not in current]
+        for doc_id in stale:
+            self.remove(doc_id)
+        for doc_id, item in current.items():
+            if doc_id not in self:
+                self.add(doc_id, item)
+
+
+_item_index = InvertedIndex()
+
+
+def get_item_index(items: list) -> InvertedIndex:
+    """Return the shared in-process index, synced incrementally with items"""
+    _item_index.sync(items)
+    return _item_index
@@ -1,56 +1,56 @@
 """
 CSS styling and theme configuration for the Lost & Found Platform
+
+The stylesheet is compiled and minified once at import. Colours are CSS
+variables: both palettes are declared in the stylesheet, and the dark one
+applies while a `lf-theme-dark` marker is on the page. apply_theme therefore
+emits the same constant stylesheet on every run, and toggling dark mode only
+swaps the marker's class instead of rebuilding and resending the CSS.
 """
 
+import re
+
 import streamlit as st
 from models import DARK_MODE_COLORS, LIGHT_MODE_COLORS, PRIMARY_COLOR, PRIMARY_HOVER
 
 
-def get_colors(dark_mode: bool) -> dict:
-    """Get color palette based on dark mode setting"""
-    return DARK_MODE_COLORS if dark_mode else LIGHT_MODE_COLORS
+def _variables(colors: dict) -> str:
+    return "".join(f"--lf-{name.replace('_', '-')}: {value};" for name, value in colors.items())
 
 
-def apply_theme(dark_mode: bool) -> None:
-    """Apply theme CSS to the Streamlit app"""
-    colors = get_colors(dark_mode)
-    
-    bg_main = colors["bg_main"]
-    bg_card = colors["bg_card"]
-    text_color = colors["text_color"]
-    border_color = colors["border_color"]
-    navbar_text = colors["navbar_text"]
-    input_bg = colors["input_bg"]
-    input_border = colors["input_border"]
-    btn_secondary_bg = colors["btn_secondary_bg"]
-    btn_secondary_text = colors["btn_secondary_text"]
-    btn_secondary_hover = colors["btn_secondary_hover"]
-    heading_color = colors["heading_color"]
-    caption_color = colors["caption_color"]
-    label_color = colors["label_color"]
-    
-    st.markdown(f"""
-<style>
+def _minify(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = re.sub(r"\s+", " ", css)
+    css = re.sub(r"\s*([{};,>])\s*", r"\1", css)
+    css = re.sub(r":\s+", ":", css)
+    return css.replace(";}", "}").strip()
+
+
+_RULES = """
+    /* Palettes: light by default, dark while the lf-theme-dark marker is rendered */
+    :root {{ {light} --lf-primary: {primary}; --lf-primary-hover: {primary_hover}; }}
+    :root:has(.lf-theme-dark) {{ {dark} }}
+
     /* Hide default sidebar */
     [data-testid="stSidebar"] {{ display: none !important; }}
     [data-testid="collapsedControl"] {{ display: none !important; }}
 
     /* Theme background & text */
-    .stApp {{ background-color: {bg_main} !important; }}
-    .stApp, .stApp p, .stApp span, .stApp div {{ color: {text_color}; }}
-    .stApp h1, .stApp h2, .stApp h3, .stApp h4 {{ color: {heading_color} !important; }}
+    .stApp {{ background-color: var(--lf-bg-main) !important; }}
+    .stApp, .stApp p, .stApp span, .stApp div {{ color: var(--lf-text-color); }}
+    .stApp h1, .stApp h2, .stApp h3, .stApp h4 {{ color: var(--lf-heading-color) !important; }}
     
     /* Captions & muted text */
-    [data-testid="stCaptionContainer"], .stCaption {{ color: {caption_color} !important; }}
+    [data-testid="stCaptionContainer"], .stCaption {{ color: var(--lf-caption-color) !important; }}
 
     /* Input fields */
     [data-testid="stTextInput"] input, 
     [data-testid="stTextArea"] textarea,
     [data-testid="stSelectbox"] > div > div,
     [data-testid="stDateInput"] input {{
-        background-color: {input_bg} !important;
-        color: {text_color} !important;
-        border: 1px solid {input_border} !important;
+        background-color: var(--lf-input-bg) !important;
+        color: var(--lf-text-color) !important;
+        border: 1px solid var(--lf-input-border) !important;
     }}
     
     /* Input labels */
@@ -59,43 +59,43 @@ def apply_theme(dark_mode: bool) -> None:
     [data-testid="stSelectbox"] label,
     [data-testid="stDateInput"] label,
     [data-testid="stFileUploader"] label {{
-        color: {label_color} !important;
+        color: var(--lf-label-color) !important;
         font-weight: 500 !important;
     }}
     
     /* Selectbox dropdown */
-    [data-baseweb="select"] {{ background-color: {input_bg} !important; }}
-    [data-baseweb="popover"] {{ background-color: {bg_card} !important; }}
-    [data-baseweb="menu"] {{ background-color: {bg_card} !important; }}
-    [data-baseweb="menu"] li {{ color: {text_color} !important; }}
-    [data-baseweb="menu"] li:hover {{ background-color: {border_color} !important; }}
+    [data-baseweb="select"] {{ background-color: var(--lf-input-bg) !important; }}
+    [data-baseweb="popover"] {{ background-color: var(--lf-bg-card) !important; }}
+    [data-baseweb="menu"] {{ background-color: var(--lf-bg-card) !important; }}
+    [data-baseweb="menu"] li {{ color: var(--lf-text-color) !important; }}
+    [data-baseweb="menu"] li:hover {{ background-color: var(--lf-border-color) !important; }}
 
     /* Profile popover — force background on all layers */
     [data-baseweb="popover"] [data-baseweb="popover-inner"] {{
-        background-color: {bg_card} !important;
+        background-color: var(--lf-bg-card) !important;
         border-radius: 12px !important;
     }}
     [data-testid="stPopoverBody"] {{
-        background-color: {bg_card} !important;
-        border: 1px solid {border_color} !important;
+        background-color: var(--lf-bg-card) !important;
+        border: 1px solid var(--lf-border-color) !important;
         border-radius: 12px !important;
         padding: 0.5rem !important;
     }}
     [data-testid="stPopoverBody"] *:not(button) {{
-        background-color: {bg_card} !important;
+        background-color: var(--lf-bg-card) !important;
     }}
     [data-testid="stPopoverBody"] p,
     [data-testid="stPopoverBody"] span {{
-        color: {text_color} !important;
+        color: var(--lf-text-color) !important;
         background-color: transparent !important;
     }}
     [data-testid="stPopoverBody"] hr {{
-        border-color: {border_color} !important;
+        border-color: var(--lf-border-color) !important;
         background-color: transparent !important;
     }}
     [data-testid="stPopoverBody"] button,
     [data-testid="stPopoverBody"] button * {{
-        background-color: {PRIMARY_COLOR} !important;
+        background-color: var(--lf-primary) !important;
         color: #ffffff !important;
         border: none !important;
         font-weight: 500 !important;
@@ -111,7 +111,7 @@ def apply_theme(dark_mode: bool) -> None:
     .profile-card .profile-avatar {{
         width: 52px; height: 52px;
         border-radius: 50%;
-        background: linear-gradient(135deg, {PRIMARY_COLOR} 0%, #3b82f6 100%);
+        background: linear-gradient(135deg, var(--lf-primary) 0%, #3b82f6 100%);
         display: inline-flex;
         align-items: center;
         justify-content: center;
@@ -124,12 +124,12 @@ def apply_theme(dark_mode: bool) -> None:
     .profile-card .profile-name {{
         font-size: 1.05rem;
         font-weight: 600;
-        color: {heading_color};
+        color: var(--lf-heading-color);
         margin-bottom: 0.3rem;
     }}
     .profile-card .profile-label {{
         font-size: 0.78rem;
-        color: {caption_color};
+        color: var(--lf-caption-color);
         margin-bottom: 0.6rem;
     }}
 
@@ -137,63 +137,63 @@ def apply_theme(dark_mode: bool) -> None:
     [data-testid="baseButton-secondary"],
     button[kind="secondary"],
     .stButton > button:not([kind="primary"]):not([data-testid="baseButton-primary"]) {{
-        background-color: {btn_secondary_bg} !important;
-        color: {btn_secondary_text} !important;
+        background-color: var(--lf-btn-secondary-bg) !important;
+        color: var(--lf-btn-secondary-text) !important;
         border: none !important;
         font-weight: 500 !important;
     }}
     [data-testid="baseButton-secondary"]:hover,
     button[kind="secondary"]:hover,
     .stButton > button:not([kind="primary"]):not([data-testid="baseButton-primary"]):hover {{
-        background-color: {btn_secondary_hover} !important;
+        background-color: var(--lf-btn-secondary-hover) !important;
         color: #ffffff !important;
     }}
 
     /* Primary buttons keep purple */
     [data-testid="baseButton-primary"] {{
-        background-color: {PRIMARY_COLOR} !important;
+        background-color: var(--lf-primary) !important;
         color: #ffffff !important;
         border: none !important;
     }}
     [data-testid="baseButton-primary"]:hover {{
-        background-color: {PRIMARY_HOVER} !important;
+        background-color: var(--lf-primary-hover) !important;
     }}
 
     /* Expanders */
     [data-testid="stExpander"] {{
-        background-color: {bg_card} !important;
-        border: 1px solid {border_color} !important;
+        background-color: var(--lf-bg-card) !important;
+        border: 1px solid var(--lf-border-color) !important;
         border-radius: 8px;
     }}
     [data-testid="stExpander"] summary {{
-        color: {text_color} !important;
-        background-color: {bg_card} !important;
+        color: var(--lf-text-color) !important;
+        background-color: var(--lf-bg-card) !important;
     }}
     [data-testid="stExpander"] summary * {{
-        color: {text_color} !important;
-        background-color: {bg_card} !important;
+        color: var(--lf-text-color) !important;
+        background-color: var(--lf-bg-card) !important;
     }}
-    [data-testid="stExpander"] summary:hover {{ color: {PRIMARY_COLOR} !important; }}
+    [data-testid="stExpander"] summary:hover {{ color: var(--lf-primary) !important; }}
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] {{
-        background-color: {bg_card} !important;
+        background-color: var(--lf-bg-card) !important;
     }}
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] *:not(button):not(button *) {{
-        background-color: {bg_card} !important;
-        color: {text_color} !important;
+        background-color: var(--lf-bg-card) !important;
+        color: var(--lf-text-color) !important;
     }}
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] p,
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] span {{
         background-color: transparent !important;
-        color: {text_color} !important;
+        color: var(--lf-text-color) !important;
     }}
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] strong {{
-        color: {heading_color} !important;
+        color: var(--lf-heading-color) !important;
         background-color: transparent !important;
     }}
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] button,
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] button * {{
-        background-color: {btn_secondary_bg} !important;
-        color: {btn_secondary_text} !important;
+        background-color: var(--lf-btn-secondary-bg) !important;
+        color: var(--lf-btn-secondary-text) !important;
         border: none !important;
     }}
     [data-testid="stExpander"] [data-testid="stExpanderDetails"] .stButton {{
@@ -201,25 +201,25 @@ def apply_theme(dark_mode: bool) -> None:
     }}
 
     /* Info/Success/Error boxes */
-    [data-testid="stAlert"] {{ background-color: {bg_card} !important; border-color: {border_color} !important; }}
+    [data-testid="stAlert"] {{ background-color: var(--lf-bg-card) !important; border-color: var(--lf-border-color) !important; }}
 
     /* Auth form card */
     .auth-card {{
-        background: {bg_card};
-        border: 1px solid {border_color};
+        background: var(--lf-bg-card);
+        border: 1px solid var(--lf-border-color);
         border-radius: 12px;
         padding: 1.5rem;
         box-shadow: 0 4px 12px rgba(0,0,0,0.08);
     }}
 
     /* Markdown dividers */
-    hr {{ border-color: {border_color} !important; opacity: 0.5; }}
+    hr {{ border-color: var(--lf-border-color) !important; opacity: 0.5; }}
 
     /* Circular avatar */
     .avatar-circle {{
         width: 38px; height: 38px;
         border-radius: 50%;
-        background: linear-gradient(135deg, {PRIMARY_COLOR} 0%, #3b82f6 100%);
+        background: linear-gradient(135deg, var(--lf-primary) 0%, #3b82f6 100%);
         display: inline-flex;
         align-items: center;
         justify-content: center;
@@ -234,11 +234,11 @@ def apply_theme(dark_mode: bool) -> None:
 
     /* Card styling */
     .item-card {{
-        background: {bg_card};
+        background: var(--lf-bg-card);
         border-radius: 12px;
         padding: 1rem;
         margin-bottom: 0.8rem;
-        border: 1px solid {border_color};
+        border: 1px solid var(--lf-border-color);
     }}
     [data-testid="stAppViewBlockContainer"] {{ max-width: 1200px; margin: 0 auto; }}
 
@@ -251,22 +251,22 @@ def apply_theme(dark_mode: bool) -> None:
 
     /* File uploader */
     [data-testid="stFileUploader"] {{ 
-        background-color: {bg_card} !important; 
-        border: 2px dashed {input_border} !important;
+        background-color: var(--lf-bg-card) !important; 
+        border: 2px dashed var(--lf-input-border) !important;
         border-radius: 10px !important;
         padding: 1rem !important;
     }}
-    [data-testid="stFileUploader"] label {{ color: {label_color} !important; font-weight: 500 !important; }}
+    [data-testid="stFileUploader"] label {{ color: var(--lf-label-color) !important; font-weight: 500 !important; }}
     [data-testid="stFileUploader"] section {{ 
-        background-color: {bg_card} !important; 
+        background-color: var(--lf-bg-card) !important; 
         border: none !important;
-        color: {text_color} !important;
+        color: var(--lf-text-color) !important;
     }}
-    [data-testid="stFileUploader"] section > div {{ color: {text_color} !important; }}
-    [data-testid="stFileUploader"] small {{ color: {caption_color} !important; }}
+    [data-testid="stFileUploader"] section > div {{ color: var(--lf-text-color) !important; }}
+    [data-testid="stFileUploader"] small {{ color: var(--lf-caption-color) !important; }}
     [data-testid="stFileUploader"] button {{
-        background-color: {btn_secondary_bg} !important;
-        color: {btn_secondary_text} !important;
+        background-color: var(--lf-btn-secondary-bg) !important;
+        color: var(--lf-btn-secondary-text) !important;
         border: none !important;
     }}
 
@@ -278,5 +278,23 @@ def apply_theme(dark_mode: bool) -> None:
     @media (min-width: 769px) and (max-width: 1024px) {{
         [data-testid="stColumn"] {{ min-width: 48% !important; }}
     }}
-</style>
-""", unsafe_allow_html=True)
+"""
+
+# Compiled once per process; identical for both themes
+STYLESHEET = "<style>" + _minify(_RULES.format(
+    light=_variables(LIGHT_MODE_COLORS),
+    dark=_variables(DARK_MODE_COLORS),
+    primary=PRIMARY_COLOR,
+    primary_hover=PRIMARY_HOVER,
+)) + "</style>"
+
+THEME_MARKERS = {
+    True: '<div class="lf-theme-dark"></div>',
+    False: '<div class="lf-theme-light"></div>',
+}
+
+
+def apply_theme(dark_mode: bool) -> None:
+    """Apply theme CSS to the Streamlit app"""
+    st.markdown(STYLESHEET, unsafe_allow_html=True)
+    st.markdown(THEME_MARKERS[bool(dark_mode)], unsafe_allow_html=True)
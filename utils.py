@@ -1,65 +1,182 @@
 import os
+import asyncio
+import json
 import hashlib
 import secrets
 import re
 import uuid
+import threading
 import base64
-from datetime import datetime, timezone, timedelta
+import mimetypes
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone, timedelta, time
+from itertools import islice
 
 from dotenv import load_dotenv
-from pymongo import MongoClient
-from pymongo.errors import DuplicateKeyError
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import MongoClient, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+from models import ITEMS_PER_PAGE, Item, User
+import async_runner
+import cache
+import connection
+import duplicates
+import image_store
+import indexes
+import item_watcher
+import matching
+import passwords
+import search
 
 load_dotenv()  # Load variables from .env file
 MONGO_URI = os.getenv("MONGO_URI", "")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "0"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+# Set to 0 when indexes are managed with `python manage.py ensure-indexes`
+AUTO_CREATE_INDEXES = os.getenv("AUTO_CREATE_INDEXES", "1") == "1"
 _client = None
 _db = None
+_db_lock = threading.Lock()
+_db_breaker = connection.CircuitBreaker(
+    base_delay=float(os.getenv("MONGO_BREAKER_BASE_DELAY", "1")),
+    max_delay=float(os.getenv("MONGO_BREAKER_MAX_DELAY", "60"))
+)
+
+IMAGE_STORE_BACKEND = os.getenv("IMAGE_STORE", "gridfs")  # "gridfs" or "local"
+IMAGE_STORE_PATH = os.getenv("IMAGE_STORE_PATH", os.path.join("data", "images", "store"))
+_local_image_store = None
+
+# Longest side in pixels of the thumbnails generated for each upload
+THUMBNAIL_SIZES = {"small": 200, "card": 400}
+THUMBNAIL_CACHE_BYTES = int(os.getenv("THUMBNAIL_CACHE_MB", "64")) * 1024 * 1024
+_thumbnail_cache = image_store.BlobCache(THUMBNAIL_CACHE_BYTES)
+
+# Listing reads shared by all sessions; every item write clears it
+ITEM_CACHE_TTL = float(os.getenv("ITEM_CACHE_TTL", "30"))
+ITEM_CACHE_SIZE = int(os.getenv("ITEM_CACHE_SIZE", "256"))
+_item_cache = cache.TTLCache(maxsize=ITEM_CACHE_SIZE, ttl=ITEM_CACHE_TTL)
+# username -> contact info, for the Contact Owner buttons
+_contact_cache = cache.TTLCache(
+    maxsize=int(os.getenv("CONTACT_CACHE_SIZE", "5000")),
+    ttl=float(os.getenv("CONTACT_CACHE_TTL", "3600"))
+)
+# Per-user My Items pages: owner -> {(skip, limit): (items, total)}, cleared on that owner's writes
+_owner_cache = cache.TTLCache(maxsize=int(os.getenv("OWNER_CACHE_SIZE", "1024")), ttl=ITEM_CACHE_TTL)
+
+# Optional background snapshot of listings: "changestream", "poll" or "off"
+ITEM_WATCHER_MODE = os.getenv("ITEM_WATCHER", "off")
+ITEM_WATCHER_POLL_INTERVAL = float(os.getenv("ITEM_WATCHER_POLL_INTERVAL", "5"))
+_item_snapshot = None
+_item_snapshot_lock = threading.Lock()
+
+# Lost <-> Found matching runs off the request path after each save
+MATCH_WORKERS = int(os.getenv("MATCH_WORKERS", "1"))
+_match_executor = ThreadPoolExecutor(max_workers=MATCH_WORKERS, thread_name_prefix="matcher")
+
+# Async data layer: Motor client on a background loop, shared by every session
+ASYNC_DB_CONCURRENCY = int(os.getenv("ASYNC_DB_CONCURRENCY", "8"))
+_async_loop = async_runner.BackgroundLoop(max_concurrency=ASYNC_DB_CONCURRENCY)
+_async_client = None
+_async_db = None
 
 MAX_IMAGE_SIZE = 1 * 1024 * 1024  # 1 MB
 ALLOWED_IMAGE_TYPES = {"image/jpeg", "image/jpg", "image/png"}
 
+# Listing queries leave out image bytes (cards fetch them via get_item_image)
+# and the write-time search/matching fields
+LISTING_PROJECTION = {
+    "_id": 0, "image.data": 0, "search_tokens": 0, "description_minhash": 0, "duplicate_keys": 0
+}
+
+# What to do when a user posts a near-duplicate of one of their open items:
+# "block", "warn" or "off"
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "block")
+
 
 def get_db():
+    """Return the lostfound database, or None while MongoDB is unreachable.
+
+    The client is created lazily without a blocking ping; pymongo connects in
+    the background. While the circuit breaker is open, calls return None
+    immediately so callers fall back to demo data instead of stalling.
+    """
     global _client, _db
+    if not MONGO_URI:
+        raise RuntimeError("MONGO_URI environment variable is not set")
+    if not _db_breaker.allow():
+        return None
     if _db is None:
-        if not MONGO_URI:
-            raise RuntimeError("MONGO_URI environment variable is not set")
-        try:
-            _client = MongoClient(MONGO_URI, serverSelectionTimeoutMS=30000, connectTimeoutMS=20000)
-            _db = _client["lostfound"]
-            # Test connection
-            _db.command('ping')
-            # Create indexes
-            _db.users.create_index("username", unique=True)
-            _db.items.create_index("created_at")
-            _db.items.create_index("owner")
-            _db.sessions.create_index("token", unique=True)
-            _db.sessions.create_index("expires_at", expireAfterSeconds=0)
-        except Exception as e:
-            print(f"⚠️ MongoDB connection error: {e}")
-            print("Check credentials in .env - MONGO_URI may have wrong username/password")
-            _db = None
-            _client = None
-            # Don't raise - return None so fallback demo data is used
+        with _db_lock:
+            if _db is None:
+                try:
+                    _client = MongoClient(
+                        MONGO_URI,
+                        maxPoolSize=MONGO_MAX_POOL_SIZE,
+                        minPoolSize=MONGO_MIN_POOL_SIZE,
+                        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                        connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                        event_listeners=[connection.BreakerTopologyListener(_db_breaker)]
+                    )
+                    _db = _client["lostfound"]
+                except Exception as e:
+                    print(f"⚠️ MongoDB connection error: {e}")
+                    print("Check credentials in .env - MONGO_URI may have wrong username/password")
+                    _client = None
+                    _db_breaker.record_failure()
+                    # Don't raise - return None so fallback demo data is used
+                    return None
+                if AUTO_CREATE_INDEXES:
+                    # One-time startup step, kept off the user-facing request
+                    threading.Thread(target=ensure_indexes, args=(_db,), daemon=True).start()
+    if _db_breaker.state == "half-open":
+        # This caller holds the trial: settle it from the driver's view of the cluster
+        if not _client.topology_description.has_readable_server():
+            _db_breaker.record_failure()
+            return None
+        _db_breaker.record_success()
     return _db
 
 
+def ensure_indexes(db=None, prune=False):
+    """Apply the declared index set (see indexes.py); returns its report or None on failure"""
+    try:
+        db = db if db is not None else get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        report = indexes.apply_indexes(db, prune=prune)
+        for error in report["errors"]:
+            print(f"⚠️ Index creation error: {error}")
+        return report
+    except Exception as e:
+        print(f"⚠️ Index creation error: {e}")
+        return None
+
+
+def db_health():
+    """Return the circuit breaker state of the MongoDB connection"""
+    return {"state": _db_breaker.state, "failures": _db_breaker.failures}
+
+
+def db_readable():
+    """True once the driver has seen a readable server; never blocks on server selection"""
+    return _client is not None and _client.topology_description.has_readable_server()
+
+
 # =============================================
 # Password Utilities
 # =============================================
 
 def hash_password(password, salt=None):
-    if salt is None:
-        salt = secrets.token_hex(16)
-    hashed = hashlib.pbkdf2_hmac('sha256', password.encode(), salt.encode(), 100000)
-    return f"{salt}${hashed.hex()}"
+    return passwords.hash_password(password, salt)
 
 
 def verify_password(password, stored_hash):
-    if '$' not in stored_hash:
-        return hashlib.sha256(password.encode()).hexdigest() == stored_hash
-    salt, _ = stored_hash.split('$', 1)
-    return hash_password(password, salt) == stored_hash
+    return passwords.verify_password(password, stored_hash)
 
 
 # =============================================
@@ -73,6 +190,10 @@ def validate_registration(username, password, contact_info):
         return False, "Username can only contain letters, numbers, and underscores."
     if not password or len(password) < 6:
         return False, "Password must be at least 6 characters."
+    return validate_contact_info(contact_info)
+
+
+def validate_contact_info(contact_info):
     if not contact_info or not contact_info.strip():
         return False, "Contact info is required."
     email_pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
@@ -99,6 +220,8 @@ def register_user(username, password, contact_info):
             "password": hash_password(password),
             "contact_info": contact_info
         })
+        # The name may be cached as "No contact info" from before it existed
+        _contact_cache.invalidate(username)
         return True, "User registered successfully"
     except DuplicateKeyError:
         return False, "Username already exists"
@@ -108,16 +231,27 @@ def register_user(username, password, contact_info):
 
 
 def authenticate_user(username, password):
+    """True/False for valid/invalid credentials, None if hashing is saturated"""
     try:
         db = get_db()
         if db is None:
             raise Exception("Database connection failed")
-        user = db.users.find_one({"username": username})
-        if user is None:
+        doc = db.users.find_one({"username": username}, {"_id": 0, "username": 1, "password": 1})
+        if doc is None:
             return False
-        stored_hash = user["password"]
-        if verify_password(password, stored_hash):
-            if '$' not in stored_hash:
+        stored_hash = User.from_dict(doc).password
+        try:
+            verified = verify_password(password, stored_hash)
+        except passwords.HashPoolBusy:
+            # Not a DB outage: report busy rather than falling back to demo login
+            print("⚠️ Auth busy: password hashing queue is full")
+            return None
+        except ValueError as e:
+            print(f"⚠️ Auth error for {username}: {e}")
+            return False
+        if verified:
+            # Upgrade legacy or outdated hashes to the configured algorithm
+            if passwords.needs_rehash(stored_hash):
                 db.users.update_one(
                     {"username": username},
                     {"$set": {"password": hash_password(password)}}
@@ -133,17 +267,74 @@ def authenticate_user(username, password):
 
 
 def get_user_contact(username):
+    return get_user_contacts([username])[username]
+
+
+def get_user_contacts(usernames):
+    """Resolve contact info for many users with at most one $in query.
+
+    Returns {username: contact}. Results are kept in an LRU cache that
+    update_user_contact invalidates.
+    """
+    contacts, missing = _cached_contacts(usernames)
+    if not missing:
+        return contacts
+    generation = _contact_cache.generation
     try:
         db = get_db()
         if db is None:
             raise Exception("Database connection failed")
-        user = db.users.find_one({"username": username}, {"contact_info": 1})
-        if user:
-            return user.get("contact_info", "No contact info")
-        return "No contact info"
+        users = db.users.find({"username": {"$in": missing}}, _CONTACT_PROJECTION)
+        _store_contacts(contacts, missing, list(users), generation)
     except Exception as e:
         print(f"⚠️ Contact lookup DB error: {e}")
-        return "Contact info unavailable"
+        for username in missing:
+            contacts[username] = "Contact info unavailable"
+    return contacts
+
+
+_CONTACT_PROJECTION = {"_id": 0, "username": 1, "contact_info": 1}
+
+
+def _cached_contacts(usernames):
+    """Split usernames into ({username: cached contact}, [usernames to look up])"""
+    contacts = {}
+    missing = []
+    for username in dict.fromkeys(usernames):
+        contact = _contact_cache.get(username)
+        if contact is None:
+            missing.append(username)
+        else:
+            contacts[username] = contact
+    return contacts, missing
+
+
+def _store_contacts(contacts, missing, users, generation):
+    found = {user["username"]: user.get("contact_info", "No contact info") for user in users}
+    for username in missing:
+        contact = found.get(username, "No contact info")
+        # Skipped if a contact changed while the lookup ran
+        _contact_cache.set(username, contact, generation=generation)
+        contacts[username] = contact
+
+
+def update_user_contact(username, contact_info):
+    """Change a user's contact info and drop their cached contact"""
+    valid, error_msg = validate_contact_info(contact_info)
+    if not valid:
+        return False, error_msg
+    try:
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        result = db.users.update_one({"username": username}, {"$set": {"contact_info": contact_info}})
+        _contact_cache.invalidate(username)
+        if result.matched_count == 0:
+            return False, "User not found"
+        return True, "Contact info updated"
+    except Exception as e:
+        print(f"⚠️ Update contact DB error: {e}")
+        return False, "Database unavailable. Please try again later."
 
 
 # =============================================
@@ -154,56 +345,466 @@ def generate_item_id():
     return str(uuid.uuid4())[:8]
 
 
+def parse_item_date(date_str):
+    """Parse an item's YYYY-MM-DD date into a datetime at midnight, or None"""
+    try:
+        return datetime.strptime(date_str, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        return None
+
+
+def derived_item_fields(item):
+    """Fields precomputed at write time so filters never parse or normalise per read.
+
+    date_value is the native form of the "date" string (BSON has no date-only
+    type, so it is midnight UTC); search_tokens are the normalised,
+    ASCII-folded words of the searchable fields; match_bucket and
+    description_minhash are the matching engine's blocking key and signature;
+    duplicate_keys are the near-duplicate lookup keys.
+    """
+    fields = {
+        "date_value": parse_item_date(item.get("date")),
+        "search_tokens": search.item_tokens(item),
+    }
+    fields.update(matching.match_fields({**item, **fields}))
+    fields["duplicate_keys"] = duplicates.duplicate_keys({**item, **fields})
+    return fields
+
+
 def save_item(item):
+    if isinstance(item, Item):
+        item = item.to_dict()
     try:
         db = get_db()
         if db is None:
             raise Exception("Database connection failed")
-        item["created_at"] = datetime.now(timezone.utc)
+        _prepare_item(item)
         db.items.insert_one(item)
+        _after_item_saved(item)
     except Exception as e:
         print(f"⚠️ Save item DB error: {e}")
         print("Item not saved due to database unavailability")
 
 
-def load_items():
-    try:
+def _prepare_item(item):
+    item["created_at"] = datetime.now(timezone.utc)
+    item.update(derived_item_fields(item))
+
+
+def _after_item_saved(item):
+    invalidate_item_cache(owner=item.get("owner"))
+    if _item_snapshot is not None:
+        _item_snapshot.upsert(item, oid=item.get("_id"))
+    _match_executor.submit(_match_in_background, item)
+
+
+def load_items(include_images=True):
+    if not include_images:
+        snapshot = get_item_snapshot()
+        if snapshot is not None:
+            return snapshot.items()
+
+    def load():
         db = get_db()
         if db is None:
             raise Exception("Database connection failed")
-        items = list(db.items.find({}, {"_id": 0}).sort("created_at", 1))
-        return items
+        projection = {"_id": 0} if include_images else LISTING_PROJECTION
+        return [Item.from_dict(doc) for doc in db.items.find({}, projection).sort("created_at", 1)]
+
+    try:
+        return _item_cache.get_or_load(("load_items", include_images), load)
     except Exception as e:
         print(f"⚠️ Could not load items from DB: {e}")
         # Return demo data so app doesn't crash
-        return [
-            {
-                "id": "demo001",
-                "title": "Lost Silver Car Keys",
-                "description": "Silver car keys, lost near Main St parking lot. Hooked to a blue keychain.",
-                "category": "Keys",
-                "type": "Lost",
-                "status": "Active",
-                "owner": "demo_user",
-                "date": "2026-02-15",
-                "location": "Main St, Downtown",
-                "created_at": datetime.now(timezone.utc),
-                "image": None
-            },
-            {
-                "id": "demo002",
-                "title": "Found iPhone 13",
-                "description": "iPhone 13, black case, found at Central Park. Found near the fountain.",
-                "category": "Electronics",
-                "type": "Found",
-                "status": "Active",
-                "owner": "demo_user",
-                "date": "2026-02-16",
-                "location": "Central Park",
-                "created_at": datetime.now(timezone.utc),
-                "image": None
-            }
-        ]
+        return _demo_items()
+
+
+def _demo_items():
+    return [Item.from_dict(doc) for doc in [
+        {
+            "id": "demo001",
+            "title": "Lost Silver Car Keys",
+            "description": "Silver car keys, lost near Main St parking lot. Hooked to a blue keychain.",
+            "category": "Keys",
+            "type": "Lost",
+            "status": "Active",
+            "owner": "demo_user",
+            "date": "2026-02-15",
+            "location": "Main St, Downtown",
+            "created_at": datetime.now(timezone.utc),
+            "image": None
+        },
+        {
+            "id": "demo002",
+            "title": "Found iPhone 13",
+            "description": "iPhone 13, black case, found at Central Park. Found near the fountain.",
+            "category": "Electronics",
+            "type": "Found",
+            "status": "Active",
+            "owner": "demo_user",
+            "date": "2026-02-16",
+            "location": "Central Park",
+            "created_at": datetime.now(timezone.utc),
+            "image": None
+        }
+    ]]
+
+
+def build_item_query(search_term="", filter_type="All", filter_status="All",
+                     filter_category="All", date_from=None, date_to=None):
+    """Translate the listing filters into a MongoDB filter document.
+
+    Items saved before date_value and search_tokens existed stay listed:
+    like filter_items, a date range never excludes an item without a date,
+    and the prefix term falls back to a word match on the raw text.
+    """
+    query = {}
+    conditions = []
+    if filter_type != "All":
+        query["type"] = filter_type
+    if filter_status != "All":
+        # Items saved without a status count as Active (see filter_items)
+        query["status"] = {"$in": ["Active", None]} if filter_status == "Active" else filter_status
+    if filter_category != "All":
+        # Items saved without a category count as Other (see filter_items)
+        query["category"] = {"$in": ["Other", None]} if filter_category == "Other" else filter_category
+    if search_term:
+        complete, prefix = search.split_query(search_term)
+        if complete:
+            # Quoting each term makes $text require all of them
+            query["$text"] = {"$search": " ".join(f'"{term}"' for term in complete)}
+        if prefix is not None:
+            # Anchored regex on the indexed token array is an index range scan
+            tokens = {"search_tokens": {"$regex": f"^{re.escape(prefix)}"}}
+            word = {"$regex": rf"\b{re.escape(prefix)}", "$options": "i"}
+            legacy = {"search_tokens": None, "$or": [{field: word} for field in search.FIELD_WEIGHTS]}
+            conditions.append({"$or": [tokens, legacy]})
+    if date_from and date_to:
+        in_range = {"date_value": {
+            "$gte": datetime.combine(date_from, time.min),
+            "$lte": datetime.combine(date_to, time.min),
+        }}
+        conditions.append({"$or": [in_range, {"date_value": None}]})
+    if len(conditions) == 1:
+        query.update(conditions[0])
+    elif conditions:
+        query["$and"] = conditions
+    return query
+
+
+def find_items(query, skip=0, limit=ITEMS_PER_PAGE, after=None):
+    """Fetch one page of items matching query, newest first.
+
+    after is a (created_at, id) keyset position: only items that sort after
+    it are returned, so deep pages cost the same as the first one. Text
+    searches are ranked by relevance and page with skip instead.
+
+    Returns (items, total_matching), or None when the database is unavailable
+    so callers can fall back to the in-memory demo data.
+    """
+
+    def load():
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        # Every page of one filter shares its total, so keyset pages don't recount
+        total = _item_cache.get_or_load(_count_cache_key(query), lambda: db.items.count_documents(query))
+        page_query, projection, sort = _page_find_args(query, after)
+        cursor = db.items.find(page_query, projection).sort(sort).skip(skip).limit(limit)
+        return [Item.from_dict(doc) for doc in cursor], total
+
+    try:
+        return _item_cache.get_or_load(_find_items_cache_key(query, skip, limit, after), load)
+    except Exception as e:
+        print(f"⚠️ Find items DB error: {e}")
+        return None
+
+
+# Facet dimensions and the value that documents without the field count as
+_FACET_DEFAULTS = {"type": None, "status": "Active", "category": "Other"}
+
+
+def facet_counts(search_term="", filter_type="All", filter_status="All",
+                 filter_category="All", date_from=None, date_to=None):
+    """Count matching items per type, status and category in one $facet aggregation.
+
+    Each dimension is counted under every filter except its own, so an
+    option's count is the number of results selecting it would give. Cached
+    per filter signature until the next item write. Returns
+    {"type": {"All": n, "Lost": n, ...}, "status": {...}, "category": {...}},
+    or None when the database is unavailable.
+    """
+    selected = {"type": filter_type, "status": filter_status, "category": filter_category}
+    signature = json.dumps([search_term, selected, date_from, date_to], sort_keys=True, default=str)
+
+    def load():
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        pipeline = _facet_pipeline(search_term, selected, date_from, date_to)
+        return _facet_result(next(db.items.aggregate(pipeline), {}))
+
+    try:
+        return _item_cache.get_or_load(("facet_counts", signature), load)
+    except Exception as e:
+        print(f"⚠️ Facet counts DB error: {e}")
+        return None
+
+
+def _facet_pipeline(search_term, selected, date_from, date_to):
+    facets = {}
+    for field, default in _FACET_DEFAULTS.items():
+        others = build_item_query(**{f"filter_{f}": v for f, v in selected.items() if f != field})
+        group_key = f"${field}" if default is None else {"$ifNull": [f"${field}", default]}
+        facets[field] = [{"$match": others}, {"$group": {"_id": group_key, "count": {"$sum": 1}}}]
+    # Search and date filters apply to every dimension, so they match once up front
+    base = build_item_query(search_term=search_term, date_from=date_from, date_to=date_to)
+    return [{"$match": base}, {"$facet": facets}]
+
+
+def _facet_result(doc):
+    result = {}
+    for field in _FACET_DEFAULTS:
+        counts = {row["_id"]: row["count"] for row in doc.get(field, [])}
+        result[field] = {"All": sum(counts.values()), **counts}
+    return result
+
+
+def _find_items_cache_key(query, skip, limit, after):
+    return ("find_items", json.dumps(query, sort_keys=True, default=str), skip, limit, str(after))
+
+
+def _count_cache_key(query):
+    return ("count_items", json.dumps(query, sort_keys=True, default=str))
+
+
+def _page_find_args(query, after):
+    """(filter, projection, sort) for one listing page"""
+    if "$text" in query:
+        # Rank search results by relevance, newest first among equals
+        projection = dict(LISTING_PROJECTION, score={"$meta": "textScore"})
+        return query, projection, [("score", {"$meta": "textScore"}), ("created_at", -1), ("id", -1)]
+    page_query = query
+    if after is not None:
+        created_at, item_id = after
+        page_query = {"$and": [query, {"$or": [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "id": {"$lt": item_id}},
+        ]}]}
+    return page_query, LISTING_PROJECTION, [("created_at", -1), ("id", -1)]
+
+
+def backfill_derived_fields(batch_size=500):
+    """Compute date_value and search_tokens for items saved before they existed.
+
+    Returns the number of items updated.
+    """
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    updated = 0
+    cursor = db.items.find(
+        {"$or": [{"date_value": {"$exists": False}}, {"search_tokens": {"$exists": False}},
+                 {"match_bucket": {"$exists": False}}, {"duplicate_keys": {"$exists": False}}]},
+        {"_id": 1, "date": 1, "title": 1, "description": 1, "location": 1, "image.ref": 1},
+        batch_size=batch_size
+    )
+    for doc in cursor:
+        db.items.update_one({"_id": doc["_id"]}, {"$set": derived_item_fields(doc)})
+        updated += 1
+    invalidate_item_cache()
+    return updated
+
+
+def find_duplicate(item):
+    """Return the owner's open item that item would duplicate, or None.
+
+    Candidates share a duplicate key with item (same image, or a matching
+    description LSH band) and come from one indexed lookup; each is then
+    confirmed by comparing signatures. Also None when the database is down.
+    """
+    probe = {**item, **derived_item_fields(item)}
+    if not probe["duplicate_keys"]:
+        return None
+    try:
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        query = {
+            "owner": item.get("owner"),
+            "duplicate_keys": {"$in": probe["duplicate_keys"]},
+            "type": item.get("type"),
+            "status": {"$in": ["Active", None]},
+        }
+        projection = {"_id": 0, "id": 1, "title": 1, "date": 1, "image.ref": 1, "description_minhash": 1}
+        for candidate in db.items.find(query, projection).limit(20):
+            if duplicates.is_duplicate(probe, candidate):
+                return candidate
+        return None
+    except Exception as e:
+        print(f"⚠️ Duplicate check DB error: {e}")
+        return None
+
+
+def load_items_by_owner(owner, skip=0, limit=ITEMS_PER_PAGE):
+    """Fetch one page of a user's items, newest first, without image bytes.
+
+    Backed by the (owner, created_at, id) index and cached per user until that
+    user's next write. Returns (items, total_items).
+    """
+    generation = _owner_cache.generation
+    pages = _owner_cache.get(owner) or {}
+    if (skip, limit) in pages:
+        return pages[(skip, limit)]
+    try:
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        query = {"owner": owner}
+        total = db.items.count_documents(query)
+        cursor = (
+            db.items.find(query, LISTING_PROJECTION)
+            .sort([("created_at", -1), ("id", -1)])
+            .skip(skip)
+            .limit(limit)
+        )
+        result = ([Item.from_dict(doc) for doc in cursor], total)
+        # Copy-on-write so concurrent readers never see a half-updated dict
+        _owner_cache.set(owner, {**pages, (skip, limit): result}, generation=generation)
+        return result
+    except Exception as e:
+        print(f"⚠️ Load owner items DB error: {e}")
+        owned = [i for i in reversed(load_items(include_images=False)) if i.owner == owner]
+        return owned[skip:skip + limit], len(owned)
+
+
+def get_item_image(item_id, size=None, image=None):
+    """Fetch the image bytes of a single item, or None if it has none.
+
+    size picks one of THUMBNAIL_SIZES; None returns the original upload.
+    image is the item's image reference when the caller already has it (a
+    listing card): a blob it names is served from the blob cache or the
+    image store without looking the item up.
+    """
+    key = None
+    if image and image.get("ref"):
+        key = image["ref"] if size is None else (image.get("thumbnails") or {}).get(size)
+    if key is not None:
+        try:
+            return get_image_store().get(key) if size is None else _cached_blob(key)
+        except Exception as e:
+            print(f"⚠️ Load image error: {e}")
+            return None
+    try:
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        item = db.items.find_one({"id": str(item_id)}, {"_id": 0, "image": 1})
+        image = item.get("image") if item else None
+        if not image:
+            return None
+        if image.get("ref"):
+            if size is None:
+                return get_image_store().get(image["ref"])
+            return _get_thumbnail(db, item_id, image, size)
+        if image.get("data"):
+            # Legacy item with the image embedded as base64
+            return base64.b64decode(image["data"])
+        return None
+    except Exception as e:
+        print(f"⚠️ Load image DB error: {e}")
+        return None
+
+
+def _get_thumbnail(db, item_id, image, size):
+    store = get_image_store()
+    key = (image.get("thumbnails") or {}).get(size)
+    if key is None:
+        # Image stored before thumbnails existed: generate this size on first request
+        original = store.get(image["ref"])
+        if original is None or not image_store.THUMBNAILS_AVAILABLE:
+            return original
+        try:
+            thumb = image_store.make_thumbnail(original, THUMBNAIL_SIZES[size])
+        except Exception as e:
+            print(f"⚠️ Thumbnail error: {e}")
+            return original
+        key = image_store.content_key(thumb) if thumb else image["ref"]
+        _retain_blob(db, key)
+        if thumb:
+            store.put(thumb, image["content_type"])
+        # Cached listings keep image.thumbnails without this size until they
+        # refresh; cards then look the item up by id (see get_item_image) and
+        # find the key stored here, so the listings need no invalidation
+        result = db.items.update_one(
+            {"id": str(item_id), f"image.thumbnails.{size}": {"$exists": False}},
+            {"$set": {f"image.thumbnails.{size}": key}}
+        )
+        if result.modified_count == 0:
+            # A concurrent request stored this thumbnail first
+            _release_blob(db, key, image["content_type"], _blob_users(key))
+        _thumbnail_cache.put(key, thumb or original)
+        return thumb or original
+    return _cached_blob(key)
+
+
+def _cached_blob(key):
+    data = _thumbnail_cache.get(key)
+    if data is None:
+        data = get_image_store().get(key)
+        if data is not None:
+            _thumbnail_cache.put(key, data)
+    return data
+
+
+def get_item_snapshot():
+    """Return the background-maintained listing snapshot, starting it on first use.
+
+    Returns None when ITEM_WATCHER is off, the database is unavailable, or the
+    initial load has not finished yet; callers then query MongoDB directly.
+    """
+    global _item_snapshot
+    if ITEM_WATCHER_MODE == "off":
+        return None
+    if _item_snapshot is None:
+        with _item_snapshot_lock:
+            if _item_snapshot is None:
+                db = get_db()
+                if db is None:
+                    return None
+                snapshot = item_watcher.ItemSnapshot(
+                    db.items,
+                    projection=LISTING_PROJECTION,
+                    mode=ITEM_WATCHER_MODE,
+                    poll_interval=ITEM_WATCHER_POLL_INTERVAL,
+                    factory=Item.from_dict
+                )
+                snapshot.start()
+                _item_snapshot = snapshot
+    return _item_snapshot if _item_snapshot.ready else None
+
+
+def invalidate_item_cache(owner=None):
+    """Drop cached listing reads after an item write.
+
+    owner also drops that user's cached My Items pages; bulk writes that may
+    touch any user's items pass no owner and clear every user's pages.
+    """
+    _item_cache.clear()
+    if owner is None:
+        _owner_cache.clear()
+    else:
+        _owner_cache.invalidate(owner)
+
+
+def session_cache_stats():
+    """Return hit/miss counters and size of the session validation cache"""
+    return _session_cache.stats()
+
+
+def item_cache_stats():
+    """Return hit/miss counters and size of the shared listing cache"""
+    return _item_cache.stats()
 
 
 def update_item_status(item_id, new_status):
@@ -211,25 +812,256 @@ def update_item_status(item_id, new_status):
         db = get_db()
         if db is None:
             raise Exception("Database connection failed")
-        db.items.update_one({"id": str(item_id)}, {"$set": {"status": new_status}})
+        item = db.items.find_one_and_update(
+            {"id": str(item_id)}, {"$set": {"status": new_status}}, _MATCH_ITEM_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        _after_status_updated(item_id, new_status, item)
+        if new_status == "Resolved":
+            # A resolved item is nobody's candidate any more
+            db.matches.delete_many(_matches_of(item_id))
     except Exception as e:
         print(f"⚠️ Update status DB error: {e}")
 
 
+def _matches_of(item_id):
+    return {"$or": [{"lost_id": str(item_id)}, {"found_id": str(item_id)}]}
+
+
+def _after_status_updated(item_id, new_status, item):
+    invalidate_item_cache(owner=(item or {}).get("owner"))
+    if _item_snapshot is not None:
+        _item_snapshot.update(str(item_id), {"status": new_status})
+    if new_status == "Active" and item is not None:
+        # Resolving dropped its matches; a reopened item is a candidate again
+        _match_executor.submit(_match_in_background, item)
+
+
 def delete_item(item_id):
     try:
         db = get_db()
         if db is None:
             raise Exception("Database connection failed")
-        db.items.delete_one({"id": str(item_id)})
+        item = db.items.find_one_and_delete({"id": str(item_id)}, {"_id": 0, "image": 1, "owner": 1})
+        _after_item_deleted(item_id, item)
+        db.matches.delete_many(_matches_of(item_id))
+        _release_image(db, (item or {}).get("image"))
     except Exception as e:
         print(f"⚠️ Delete item DB error: {e}")
 
 
+def _after_item_deleted(item_id, item):
+    invalidate_item_cache(owner=(item or {}).get("owner"))
+    if _item_snapshot is not None:
+        _item_snapshot.remove(str(item_id))
+
+
+def _release_image(db, image):
+    """Drop the references an item held on its original and thumbnail blobs"""
+    for key in _image_keys(image):
+        _release_blob(db, key, image.get("content_type"), _blob_users(key))
+
+
+def _image_keys(image):
+    """Blob keys an image reference holds, one per use (thumbnails may reuse the original)"""
+    if not (image or {}).get("ref"):
+        return []
+    return [image["ref"], *(image.get("thumbnails") or {}).values()]
+
+
+def _blob_users(key):
+    """Query for items that use a blob as their original or as a thumbnail"""
+    return {"$or": [{"image.ref": key},
+                    *({f"image.thumbnails.{name}": key} for name in THUMBNAIL_SIZES)]}
+
+
+def _retain_blob(db, key):
+    """Count one more reference to a blob; done before the blob is put"""
+    db.image_refs.update_one({"_id": key}, {"$inc": {"refs": 1}}, upsert=True)
+
+
+def _release_blob(db, key, content_type, legacy_query):
+    """Drop one reference to a blob and delete the blob once none are left.
+
+    Blobs are shared by identical uploads. An upload retains the key before
+    it puts the blob, so a retain that races this delete is visible in the
+    re-check afterwards, and the blob is put back. Blobs stored before
+    reference counting fall back to legacy_query, a lookup for items still
+    using them.
+    """
+    counter = db.image_refs.find_one_and_update(
+        {"_id": key}, {"$inc": {"refs": -1}}, return_document=ReturnDocument.AFTER
+    )
+    if counter is None:
+        if db.items.count_documents(legacy_query, limit=1) == 0:
+            get_image_store().delete(key)
+        return
+    if counter["refs"] > 0:
+        return
+    store = get_image_store()
+    data = store.get(key)
+    store.delete(key)
+    counter = db.image_refs.find_one({"_id": key})
+    if counter is not None and counter["refs"] > 0:
+        if data is not None:
+            store.put(data, content_type)
+    else:
+        db.image_refs.delete_one({"_id": key, "refs": {"$lte": 0}})
+
+
+# =============================================
+# Lost <-> Found Matching
+# =============================================
+
+_MATCH_CANDIDATE_PROJECTION = {
+    "_id": 0, "id": 1, "type": 1, "owner": 1, "date_value": 1, "location": 1, "description_minhash": 1
+}
+# What match_item needs of the item being matched
+_MATCH_ITEM_PROJECTION = dict(_MATCH_CANDIDATE_PROJECTION, category=1, status=1, match_bucket=1)
+
+
+def match_item(item):
+    """Score item against open items of the opposite type and store the matches.
+
+    Candidates come from the (category, type, status, match_bucket) blocking
+    index, so only same-category items from nearby weeks are scored. Returns
+    the number of matches stored.
+    """
+    opposite = matching.OPPOSITE_TYPE.get(item.get("type"))
+    bucket = item.get("match_bucket")
+    if opposite is None or bucket is None or (item.get("status") or "Active") != "Active":
+        return 0
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    query = {
+        "category": item.get("category"),
+        "type": opposite,
+        "status": {"$in": ["Active", None]},
+        "match_bucket": {"$in": matching.candidate_buckets(bucket)},
+    }
+    now = datetime.now(timezone.utc)
+    ops = []
+    for candidate in db.items.find(query, _MATCH_CANDIDATE_PROJECTION):
+        if candidate.get("owner") == item.get("owner"):
+            continue
+        score = matching.score(item, candidate)
+        if score is None:
+            continue
+        lost, found = (item, candidate) if item["type"] == "Lost" else (candidate, item)
+        ops.append(UpdateOne(
+            {"lost_id": lost["id"], "found_id": found["id"]},
+            {"$set": {"score": score, "lost_owner": lost.get("owner"),
+                      "found_owner": found.get("owner"), "matched_at": now}},
+            upsert=True
+        ))
+    if ops:
+        db.matches.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+def _match_in_background(item):
+    try:
+        match_item(item)
+    except Exception as e:
+        print(f"⚠️ Matching error: {e}")
+
+
+def match_all_items(batch_size=500):
+    """Run matching for every open item, e.g. after backfill_derived_fields; returns matches stored"""
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    cursor = db.items.find({"type": "Lost", "status": {"$in": ["Active", None]}},
+                           _MATCH_ITEM_PROJECTION, batch_size=batch_size)
+    # Matches are symmetric, so scoring every Lost item against Found ones covers all pairs
+    return sum(match_item(item) for item in cursor)
+
+
+def get_item_matches(item_ids):
+    """Return {item_id: [(Item, score), ...]} of open matches, best first, in two queries"""
+    matches = {item_id: [] for item_id in item_ids}
+    try:
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        ids = list(matches)
+        rows = list(db.matches.find(
+            {"$or": [{"lost_id": {"$in": ids}}, {"found_id": {"$in": ids}}]},
+            {"_id": 0, "lost_id": 1, "found_id": 1, "score": 1}
+        ))
+        # Both sides: two requested items can be each other's match
+        other_ids = {row[side] for row in rows for side in ("lost_id", "found_id")}
+        others = {
+            doc["id"]: Item.from_dict(doc)
+            for doc in db.items.find({"id": {"$in": list(other_ids)}, "status": {"$in": ["Active", None]}},
+                                     LISTING_PROJECTION)
+        }
+        for row in rows:
+            for mine, theirs in ((row["lost_id"], row["found_id"]), (row["found_id"], row["lost_id"])):
+                if mine in matches and theirs in others:
+                    matches[mine].append((others[theirs], row["score"]))
+        for found in matches.values():
+            found.sort(key=lambda match: match[1], reverse=True)
+    except Exception as e:
+        print(f"⚠️ Load matches DB error: {e}")
+    return matches
+
+
 # =============================================
 # Image Utilities
 # =============================================
 
+def get_image_store():
+    """Return the configured image store backend"""
+    global _local_image_store
+    if IMAGE_STORE_BACKEND == "local":
+        if _local_image_store is None:
+            _local_image_store = image_store.LocalImageStore(IMAGE_STORE_PATH)
+        return _local_image_store
+    db = get_db()
+    if db is None:
+        raise Exception("Database connection failed")
+    return image_store.GridFSImageStore(db)
+
+
+def store_image_bytes(file_bytes, content_type):
+    """Put image bytes and their thumbnails in the image store.
+
+    Returns the item's image reference.
+    """
+    store = get_image_store()
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    key = image_store.content_key(file_bytes)
+    _retain_blob(db, key)
+    store.put(file_bytes, content_type)
+    ref = {
+        "ref": key,
+        "content_type": content_type,
+        "size": len(file_bytes)
+    }
+    if image_store.THUMBNAILS_AVAILABLE:
+        thumbs = {}
+        for name, max_side in THUMBNAIL_SIZES.items():
+            try:
+                thumbs[name] = image_store.make_thumbnail(file_bytes, max_side)
+            except Exception as e:
+                print(f"⚠️ Thumbnail error: {e}")
+                break
+        else:
+            thumbnails = {}
+            for name, thumb in thumbs.items():
+                # Images already smaller than the thumbnail size are served as is
+                thumbnails[name] = image_store.content_key(thumb) if thumb else key
+                _retain_blob(db, thumbnails[name])
+                if thumb:
+                    store.put(thumb, content_type)
+            ref["thumbnails"] = thumbnails
+    return ref
+
+
 def save_uploaded_image(uploaded_file):
     if uploaded_file is None:
         return None
@@ -244,11 +1076,241 @@ def save_uploaded_image(uploaded_file):
     if content_type not in ALLOWED_IMAGE_TYPES:
         return None
 
-    encoded = base64.b64encode(file_bytes).decode("utf-8")
-    return {
-        "data": encoded,
-        "content_type": content_type
-    }
+    try:
+        return store_image_bytes(file_bytes, content_type)
+    except Exception as e:
+        print(f"⚠️ Image store error: {e}")
+        # Keep the upload by embedding it; migrate_embedded_images moves it later
+        return {
+            "data": base64.b64encode(file_bytes).decode("utf-8"),
+            "content_type": content_type
+        }
+
+
+def discard_uploaded_image(image_obj):
+    """Delete a stored upload whose item was never saved, unless another item uses it"""
+    try:
+        db = get_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        _release_image(db, image_obj)
+    except Exception as e:
+        print(f"⚠️ Discard image error: {e}")
+
+
+def migrate_embedded_images(batch_size=100):
+    """Move base64 images embedded in item documents into the image store.
+
+    Returns the number of items migrated.
+    """
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    migrated = 0
+    cursor = db.items.find(
+        {"image.data": {"$exists": True}},
+        {"_id": 1, "image": 1},
+        batch_size=batch_size
+    )
+    for doc in cursor:
+        image = doc["image"]
+        file_bytes = base64.b64decode(image["data"])
+        ref = store_image_bytes(file_bytes, image.get("content_type", "image/jpeg"))
+        db.items.update_one({"_id": doc["_id"]}, {"$set": {"image": ref}})
+        migrated += 1
+    invalidate_item_cache()
+    return migrated
+
+
+# =============================================
+# Bulk Import / Export
+# =============================================
+
+# Exports leave out what import_items recomputes
+EXPORT_PROJECTION = {
+    "_id": 0, "search_tokens": 0, "date_value": 0, "match_bucket": 0,
+    "description_minhash": 0, "duplicate_keys": 0
+}
+
+
+def import_items(records, batch_size=500, image_root=".", on_batch=None):
+    """Insert item records in unordered insert_many batches.
+
+    Each record gets created_at (unless it has one) and the derived search,
+    date and matching fields; image_path files (relative to image_root) and
+    embedded base64 images are put in the image store. Items whose id already
+    exists are skipped before their images are stored, so an interrupted
+    import can simply be re-run. Malformed records are counted as failed and
+    skipped. on_batch(stats) is called after every batch. Returns
+    {"inserted": n, "skipped": n, "failed": n}.
+    """
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    # Duplicates are only detected once the unique indexes exist
+    ensure_indexes(db)
+    image_refs = {}
+    stats = _insert_batches(
+        db.items, records, lambda record: _import_item(db, record, image_root, image_refs),
+        batch_size, on_batch, key="id",
+        # Another writer can still insert the same id between the check and the insert
+        on_duplicate=lambda doc: _release_image(db, doc.get("image"))
+    )
+    invalidate_item_cache()
+    return stats
+
+
+def import_users(records, batch_size=500, on_batch=None):
+    """Insert user records in unordered insert_many batches.
+
+    Accepts {"username", "password", "contact_info"} records or the legacy
+    users.json mapping of username -> {"password", "contact_info"}. Password
+    hashes are kept as they are; legacy formats are upgraded on next login.
+    Existing usernames are skipped. Returns the same stats as import_items.
+    """
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    ensure_indexes(db)
+
+    def users():
+        for record in records:
+            if isinstance(record, dict) and "username" not in record:
+                for username, fields in record.items():
+                    yield {**fields, "username": username} if isinstance(fields, dict) else fields
+            else:
+                yield record
+
+    stats = _insert_batches(db.users, users(), lambda record: User.from_dict(record).to_dict(),
+                            batch_size, on_batch)
+    _contact_cache.clear()
+    return stats
+
+
+def iter_export_items(batch_size=1000):
+    """Yield every item, oldest first, from a cursor fetching batch_size documents at a time"""
+    db = get_db()
+    if db is None:
+        raise RuntimeError("Database connection failed")
+    yield from db.items.find({}, EXPORT_PROJECTION, batch_size=batch_size).sort([("created_at", 1), ("id", 1)])
+
+
+def _import_item(db, record, image_root, image_refs):
+    record = dict(record)
+    image_path = record.pop("image_path", None)
+    created_at = record.pop("created_at", None)
+    record.pop("score", None)
+    item = Item.from_dict(record).to_dict()
+    item["id"] = str(item["id"] or generate_item_id())
+    if isinstance(created_at, str):
+        created_at = datetime.fromisoformat(created_at)
+    item["created_at"] = created_at or datetime.now(timezone.utc)
+    item.update(derived_item_fields(item))
+    image = item["image"]
+    # Images last: a record that fails validation must not leave a blob behind
+    if image_path:
+        item["image"] = _import_image_file(db, image_path, image_root, image_refs)
+    elif isinstance(image, dict) and "data" in image:
+        data = base64.b64decode(image["data"], validate=True)
+        item["image"] = store_image_bytes(data, image.get("content_type", "image/jpeg"))
+    elif isinstance(image, dict) and image.get("ref"):
+        # Exported items reference blobs that must already be in this store
+        item["image"] = _import_image_ref(db, image)
+    # The image key is only known now
+    item["duplicate_keys"] = duplicates.duplicate_keys(item)
+    return item
+
+
+def _import_image_ref(db, image):
+    """Retain the blobs of an exported image reference; missing thumbnails are regenerated lazily"""
+    store = get_image_store()
+    if not store.exists(image["ref"]):
+        raise ValueError(f"Image {image['ref']} is not in the image store")
+    image = dict(image)
+    thumbnails = {name: key for name, key in (image.pop("thumbnails", None) or {}).items() if store.exists(key)}
+    if thumbnails:
+        image["thumbnails"] = thumbnails
+    for key in _image_keys(image):
+        _retain_blob(db, key)
+    return image
+
+
+def _import_image_file(db, image_path, image_root, image_refs):
+    """Image ref for a file referenced by an import, stored once per path"""
+    if image_path in image_refs:
+        ref = image_refs[image_path]
+        # Every item holds its own reference on the shared blobs
+        for key in _image_keys(ref):
+            _retain_blob(db, key)
+        return ref
+    # Legacy paths were written on Windows
+    path = os.path.join(image_root, image_path.replace("\\", "/"))
+    content_type = mimetypes.guess_type(path)[0]
+    ref = None
+    if content_type not in ALLOWED_IMAGE_TYPES:
+        print(f"⚠️ Skipping image {image_path}: unsupported type {content_type}")
+    else:
+        try:
+            with open(path, "rb") as f:
+                ref = store_image_bytes(f.read(), content_type)
+        except OSError as e:
+            print(f"⚠️ Image import error: {e}")
+    image_refs[image_path] = ref
+    return ref
+
+
+def _insert_batches(collection, records, convert, batch_size, on_batch, key=None, on_duplicate=None):
+    """Convert and insert records batch_size at a time.
+
+    With key, records whose key value is already in the collection are
+    skipped before convert runs. A record convert rejects (not an object, a
+    bad date or bad base64) is counted as failed. on_duplicate(doc)
+    is called for documents the server still rejects as duplicates.
+    """
+    stats = {"inserted": 0, "skipped": 0, "failed": 0}
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, batch_size))
+        if not chunk:
+            return stats
+        existing = _existing_keys(collection, chunk, key) if key else set()
+        batch = []
+        for record in chunk:
+            if existing and isinstance(record, dict) and str(record.get(key)) in existing:
+                stats["skipped"] += 1
+                continue
+            try:
+                batch.append(convert(record))
+            except (ValueError, TypeError, AttributeError) as e:
+                stats["failed"] += 1
+                print(f"⚠️ Skipping malformed {collection.name} record: {e}")
+        if batch:
+            _insert_batch(collection, batch, stats, on_duplicate)
+        if on_batch is not None:
+            on_batch(stats)
+
+
+def _existing_keys(collection, chunk, key):
+    values = [str(record[key]) for record in chunk if isinstance(record, dict) and record.get(key)]
+    if not values:
+        return set()
+    return {doc[key] for doc in collection.find({key: {"$in": values}}, {"_id": 0, key: 1})}
+
+
+def _insert_batch(collection, batch, stats, on_duplicate=None):
+    try:
+        # Unordered: the server inserts the rest of the batch past a failing document
+        stats["inserted"] += len(collection.insert_many(batch, ordered=False).inserted_ids)
+    except BulkWriteError as e:
+        stats["inserted"] += e.details["nInserted"]
+        for error in e.details["writeErrors"]:
+            if error["code"] == 11000:
+                stats["skipped"] += 1
+                if on_duplicate is not None:
+                    on_duplicate(batch[error["index"]])
+            else:
+                stats["failed"] += 1
+                print(f"⚠️ Import write error: {error['errmsg']}")
 
 
 # =============================================
@@ -257,6 +1319,23 @@ def save_uploaded_image(uploaded_file):
 
 SESSION_DURATION_DAYS = 7
 
+# Validated sessions, keyed by token hash so raw tokens are never held in memory
+SESSION_CACHE_TTL = float(os.getenv("SESSION_CACHE_TTL", "300"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "10000"))
+_session_cache = cache.TTLCache(maxsize=SESSION_CACHE_SIZE, ttl=SESSION_CACHE_TTL)
+
+
+def _session_cache_key(token):
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _cache_session(token, username, expires_at):
+    """Cache a valid session, never past its own expiry"""
+    remaining = (expires_at - datetime.utcnow()).total_seconds()
+    if remaining > 0:
+        _session_cache.set(_session_cache_key(token), (username, expires_at),
+                           ttl=min(SESSION_CACHE_TTL, remaining))
+
 
 def create_session(username):
     """Create a session token for a user, store in MongoDB, return token string."""
@@ -271,6 +1350,7 @@ def create_session(username):
             "created_at": now,
             "expires_at": expires,
         })
+        _cache_session(token, username, expires)
         return token
     except Exception as e:
         print(f"⚠️ Create session DB error: {e}")
@@ -278,16 +1358,30 @@ def create_session(username):
         return secrets.token_hex(32)
 
 
+def _cached_session_user(token):
+    cached = _session_cache.get(_session_cache_key(token))
+    if cached is not None:
+        username, expires_at = cached
+        if expires_at > datetime.utcnow():
+            return username
+        _session_cache.invalidate(_session_cache_key(token))
+    return None
+
+
 def validate_session(token):
     """Check if a session token is valid. Returns username or None."""
     if not token:
         return None
+    username = _cached_session_user(token)
+    if username is not None:
+        return username
     try:
         db = get_db()
         if db is None:
             raise Exception("Database connection failed")
         session = db.sessions.find_one({"token": token})
         if session and session.get("expires_at") > datetime.utcnow():
+            _cache_session(token, session["username"], session["expires_at"])
             return session["username"]
         # Expired or not found
         if session:
@@ -303,8 +1397,227 @@ def delete_session(token):
     """Remove a session token (logout)."""
     if not token:
         return
+    _session_cache.invalidate(_session_cache_key(token))
     try:
         db = get_db()
         db.sessions.delete_one({"token": token})
     except Exception as e:
         print(f"⚠️ Delete session DB error: {e}")
+
+
+# =============================================
+# Async Data Access (Motor)
+# =============================================
+#
+# Coroutine versions of the read and write helpers above. They share the
+# listing, contact and session caches and the after-write hooks with the sync
+# functions, and fall back the same way when MongoDB is unreachable. Motor
+# clients belong to the loop that created them, so every coroutine here runs
+# on _async_loop; the Streamlit script calls them through run_async and
+# run_concurrently.
+
+def run_async(coro, timeout=None):
+    """Run one coroutine from this module on the background loop and return its result"""
+    return _async_loop.run(coro, timeout)
+
+
+def run_concurrently(*coros, timeout=None):
+    """Run independent coroutines concurrently (at most ASYNC_DB_CONCURRENCY at once).
+
+    Blocks until all are done and returns their results in order.
+    """
+    return _async_loop.gather(*coros, timeout=timeout)
+
+
+def get_async_db():
+    """Return the Motor handle on the lostfound database, or None while MongoDB is unreachable.
+
+    Only call from coroutines on the background loop. Reuses get_db() for the
+    circuit breaker and database name, so both clients fail over together.
+    """
+    global _async_client, _async_db
+    db = get_db()
+    if db is None:
+        return None
+    if _async_db is None or _async_db.name != db.name:
+        if _async_client is None:
+            _async_client = AsyncIOMotorClient(
+                MONGO_URI,
+                maxPoolSize=MONGO_MAX_POOL_SIZE,
+                minPoolSize=MONGO_MIN_POOL_SIZE,
+                maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+                serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+                connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+                # Its heartbeats feed the same breaker as the sync client's
+                event_listeners=[connection.BreakerTopologyListener(_db_breaker)]
+            )
+        _async_db = _async_client[db.name]
+    return _async_db
+
+
+async def load_items_async(include_images=True):
+    if not include_images:
+        snapshot = get_item_snapshot()
+        if snapshot is not None:
+            return snapshot.items()
+    cache_key = ("load_items", include_images)
+    items = _item_cache.get(cache_key)
+    if items is not None:
+        return items
+    # A write during the query leaves the cache alone (see TTLCache.set)
+    generation = _item_cache.generation
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        projection = {"_id": 0} if include_images else LISTING_PROJECTION
+        cursor = db.items.find({}, projection).sort("created_at", 1)
+        items = [Item.from_dict(doc) async for doc in cursor]
+        _item_cache.set(cache_key, items, generation=generation)
+        return items
+    except Exception as e:
+        print(f"⚠️ Could not load items from DB: {e}")
+        return _demo_items()
+
+
+async def find_items_async(query, skip=0, limit=ITEMS_PER_PAGE, after=None):
+    """Async find_items: the count and the page query run concurrently"""
+    cache_key = _find_items_cache_key(query, skip, limit, after)
+    result = _item_cache.get(cache_key)
+    if result is not None:
+        return result
+    # A write during the query leaves the cache alone (see TTLCache.set)
+    generation = _item_cache.generation
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        page_query, projection, sort = _page_find_args(query, after)
+        cursor = db.items.find(page_query, projection).sort(sort).skip(skip).limit(limit)
+        count_key = _count_cache_key(query)
+        total = _item_cache.get(count_key)
+        if total is None:
+            total, docs = await asyncio.gather(db.items.count_documents(query), cursor.to_list(length=limit))
+            _item_cache.set(count_key, total, generation=generation)
+        else:
+            docs = await cursor.to_list(length=limit)
+        result = ([Item.from_dict(doc) for doc in docs], total)
+        _item_cache.set(cache_key, result, generation=generation)
+        return result
+    except Exception as e:
+        print(f"⚠️ Find items DB error: {e}")
+        return None
+
+
+async def facet_counts_async(search_term="", filter_type="All", filter_status="All",
+                             filter_category="All", date_from=None, date_to=None):
+    selected = {"type": filter_type, "status": filter_status, "category": filter_category}
+    signature = json.dumps([search_term, selected, date_from, date_to], sort_keys=True, default=str)
+    cache_key = ("facet_counts", signature)
+    result = _item_cache.get(cache_key)
+    if result is not None:
+        return result
+    # A write during the query leaves the cache alone (see TTLCache.set)
+    generation = _item_cache.generation
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        pipeline = _facet_pipeline(search_term, selected, date_from, date_to)
+        docs = await db.items.aggregate(pipeline).to_list(length=1)
+        result = _facet_result(docs[0] if docs else {})
+        _item_cache.set(cache_key, result, generation=generation)
+        return result
+    except Exception as e:
+        print(f"⚠️ Facet counts DB error: {e}")
+        return None
+
+
+async def get_user_contact_async(username):
+    return (await get_user_contacts_async([username]))[username]
+
+
+async def get_user_contacts_async(usernames):
+    contacts, missing = _cached_contacts(usernames)
+    if not missing:
+        return contacts
+    generation = _contact_cache.generation
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        cursor = db.users.find({"username": {"$in": missing}}, _CONTACT_PROJECTION)
+        _store_contacts(contacts, missing, await cursor.to_list(length=None), generation)
+    except Exception as e:
+        print(f"⚠️ Contact lookup DB error: {e}")
+        for username in missing:
+            contacts[username] = "Contact info unavailable"
+    return contacts
+
+
+async def validate_session_async(token):
+    if not token:
+        return None
+    username = _cached_session_user(token)
+    if username is not None:
+        return username
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        session = await db.sessions.find_one({"token": token})
+        if session and session.get("expires_at") > datetime.utcnow():
+            _cache_session(token, session["username"], session["expires_at"])
+            return session["username"]
+        if session:
+            await db.sessions.delete_one({"token": token})
+        return None
+    except Exception as e:
+        print(f"⚠️ Validate session DB error: {e}")
+        return "demo_user" if token else None
+
+
+async def save_item_async(item):
+    if isinstance(item, Item):
+        item = item.to_dict()
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        _prepare_item(item)
+        await db.items.insert_one(item)
+        _after_item_saved(item)
+    except Exception as e:
+        print(f"⚠️ Save item DB error: {e}")
+        print("Item not saved due to database unavailability")
+
+
+async def update_item_status_async(item_id, new_status):
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        item = await db.items.find_one_and_update(
+            {"id": str(item_id)}, {"$set": {"status": new_status}}, _MATCH_ITEM_PROJECTION,
+            return_document=ReturnDocument.AFTER
+        )
+        _after_status_updated(item_id, new_status, item)
+        if new_status == "Resolved":
+            await db.matches.delete_many(_matches_of(item_id))
+    except Exception as e:
+        print(f"⚠️ Update status DB error: {e}")
+
+
+async def delete_item_async(item_id):
+    try:
+        db = get_async_db()
+        if db is None:
+            raise Exception("Database connection failed")
+        item = await db.items.find_one_and_delete({"id": str(item_id)}, {"_id": 0, "image": 1, "owner": 1})
+        _after_item_deleted(item_id, item)
+        await db.matches.delete_many(_matches_of(item_id))
+        # The image store is synchronous (GridFS or local files); keep it off the loop
+        await asyncio.get_running_loop().run_in_executor(
+            None, _release_image, get_db(), (item or {}).get("image"))
+    except Exception as e:
+        print(f"⚠️ Delete item DB error: {e}")
@@ -1,8 +1,27 @@
 import utils
+import indexes
+import image_store
+import passwords
+import search
+import item_watcher
+import models
+import listing_index
+import matching
+import controllers
+import async_runner
+import asyncio
+import cache
+import bulk_io
+import connection
 import os
+import threading
+import time
 import io
 import base64
 import hashlib
+from datetime import datetime, timedelta
+
+from PIL import Image
 
 # =============================================
 # Setup: Point utils at a test database
@@ -22,9 +41,7 @@ utils.get_db = _test_get_db
 db = utils.get_db()
 db.users.drop()
 db.items.drop()
-db.users.create_index("username", unique=True)
-db.items.create_index("created_at")
-db.items.create_index("owner")
+indexes.apply_indexes(db)
 print("  ✓ Test environment ready.")
 
 # =============================================
@@ -74,6 +91,20 @@ assert utils.authenticate_user("testuser", "password123") == True
 assert utils.authenticate_user("testuser", "wrongpassword") == False
 assert utils.authenticate_user("nonexistent", "password123") == False
 
+# A saturated hash pool or a malformed stored hash is not a DB outage
+db.users.insert_one({"username": "demo", "password": "bogus$1$2", "contact_info": "demo@example.com"})
+assert utils.authenticate_user("demo", "demo123") == False, "Malformed hash must not hit the demo fallback"
+real_verify = utils.verify_password
+def busy_verify(password, stored_hash):
+    raise passwords.HashPoolBusy("Password hashing queue is full")
+utils.verify_password = busy_verify
+try:
+    assert utils.authenticate_user("demo", "demo123") is None, "Busy pool should report None"
+    assert utils.authenticate_user("testuser", "password123") is None
+finally:
+    utils.verify_password = real_verify
+db.users.delete_one({"username": "demo"})
+
 user_doc = db.users.find_one({"username": "testuser"})
 assert "$" in user_doc["password"], "Password should be in PBKDF2 salt$hash format"
 print("  ✓ Authentication passed.")
@@ -91,6 +122,21 @@ assert utils.verify_password("wrongpassword", hash1) == False
 legacy_hash = hashlib.sha256("legacypass".encode()).hexdigest()
 assert utils.verify_password("legacypass", legacy_hash) == True
 assert utils.verify_password("wrongpass", legacy_hash) == False
+
+legacy_pbkdf2 = "efa137a7f6b642874afee72f1b9be808$" + hashlib.pbkdf2_hmac(
+    "sha256", b"oldformat", b"efa137a7f6b642874afee72f1b9be808", 100000).hex()
+assert utils.verify_password("oldformat", legacy_pbkdf2) == True, "Legacy salt$hash format should verify"
+assert passwords.needs_rehash(legacy_pbkdf2) and passwords.needs_rehash(legacy_hash)
+assert not passwords.needs_rehash(hash1)
+
+db.users.insert_one({"username": "legacyuser", "password": legacy_pbkdf2, "contact_info": "old@example.com"})
+assert utils.authenticate_user("legacyuser", "oldformat") == True
+upgraded = db.users.find_one({"username": "legacyuser"})["password"]
+assert upgraded.startswith(passwords.ALGORITHM + "$"), "Outdated hashes should be upgraded on login"
+assert utils.authenticate_user("legacyuser", "oldformat") == True
+
+stats = passwords.pool_stats()
+assert stats["completed"] > 0 and stats["pending"] == 0
 print("  ✓ Password hashing passed.")
 
 # =============================================
@@ -120,6 +166,9 @@ loaded_items = utils.load_items()
 assert len(loaded_items) == 1
 assert loaded_items[0]["title"] == "Lost Keys"
 assert loaded_items[0]["category"] == "Keys"
+assert isinstance(loaded_items[0], models.Item) and loaded_items[0].title == "Lost Keys"
+assert models.Item.from_dict(loaded_items[0].to_dict()).to_dict() == loaded_items[0].to_dict()
+assert not hasattr(loaded_items[0], "__dict__"), "Items should be compact __slots__ records"
 
 id2 = utils.generate_item_id()
 assert id2 != item_id, "IDs should be unique"
@@ -141,7 +190,7 @@ print("  ✓ Item status update passed.")
 # =============================================
 # 7. Test Image Save (base64)
 # =============================================
-print("Testing image save (base64)...")
+print("Testing image save (image store)...")
 fake_png = b"\x89PNG\r\n\x1a\n" + b"\x00" * 100
 mock_file = io.BytesIO(fake_png)
 mock_file.name = "test_image.png"
@@ -149,12 +198,14 @@ mock_file.type = "image/png"
 image_obj = utils.save_uploaded_image(mock_file)
 assert image_obj is not None
 assert isinstance(image_obj, dict)
-assert "data" in image_obj
-assert "content_type" in image_obj
+assert "data" not in image_obj, "Image bytes should live in the image store"
+assert image_obj["ref"] == hashlib.sha256(fake_png).hexdigest()
 assert image_obj["content_type"] == "image/png"
+assert utils.get_image_store().get(image_obj["ref"]) == fake_png, "Stored image should match original bytes"
 
-decoded = base64.b64decode(image_obj["data"])
-assert decoded == fake_png, "Decoded image should match original bytes"
+# Identical uploads are stored once
+mock_file.seek(0)
+assert utils.save_uploaded_image(mock_file)["ref"] == image_obj["ref"]
 
 # Reject oversized file
 big_file = io.BytesIO(b"\x00" * (2 * 1024 * 1024))
@@ -188,6 +239,12 @@ utils.save_item({
 })
 assert len(utils.load_items()) == 2
 
+listed = [i for i in utils.load_items(include_images=False) if i["id"] == item_with_image_id][0]
+assert "data" not in listed["image"], "Listing mode should project out image bytes"
+assert listed["image"]["content_type"] == "image/png"
+assert utils.get_item_image(item_with_image_id) == fake_png
+assert utils.get_item_image(item_id) is None, "Item without image should return None"
+
 utils.delete_item(item_with_image_id)
 remaining = utils.load_items()
 assert len(remaining) == 1
@@ -200,8 +257,8 @@ print("Testing MongoDB collections...")
 assert db.users.count_documents({}) >= 1
 assert db.items.count_documents({}) >= 1
 
-indexes = db.users.index_information()
-has_username_index = any("username" in str(v.get("key", "")) for v in indexes.values())
+user_indexes = db.users.index_information()
+has_username_index = any("username" in str(v.get("key", "")) for v in user_indexes.values())
 assert has_username_index, "users collection should have username index"
 print("  ✓ MongoDB collections passed.")
 
@@ -214,8 +271,798 @@ contact = utils.get_user_contact("contactuser")
 assert contact == "hello@world.com"
 contact = utils.get_user_contact("nonexistent")
 assert contact == "No contact info"
+
+contacts = utils.get_user_contacts(["contactuser", "testuser", "nonexistent", "contactuser"])
+assert contacts == {"contactuser": "hello@world.com", "testuser": "test@example.com", "nonexistent": "No contact info"}
+success, msg = utils.update_user_contact("contactuser", "new@world.com")
+assert success, msg
+assert utils.get_user_contact("contactuser") == "new@world.com", "Profile changes should invalidate the cached contact"
+success, msg = utils.update_user_contact("contactuser", "not-valid")
+assert not success
 print("  ✓ get_user_contact passed.")
 
+# =============================================
+# 11. Test Listing Query Push-down
+# =============================================
+print("Testing listing query push-down...")
+query = utils.build_item_query(filter_type="Lost", filter_status="Active", filter_category="Keys")
+assert query["type"] == "Lost"
+assert query["category"] == "Keys"
+assert utils.build_item_query() == {}, "No filters should match everything"
+
+page, total = utils.find_items(utils.build_item_query(filter_type="Lost"), skip=0, limit=10)
+assert total == 1 and page[0]["title"] == "Lost Keys"
+page, total = utils.find_items(utils.build_item_query(search_term="blue KEY"), skip=0, limit=10)
+assert total == 1, "Search should be case-insensitive with prefix matching on the last word"
+page, total = utils.find_items(utils.build_item_query(search_term="blue keychain "), skip=0, limit=10)
+assert total == 1 and "score" in page[0], "Complete words should use the ranked text index"
+page, total = utils.find_items(utils.build_item_query(search_term="red key"), skip=0, limit=10)
+assert total == 0, "All search terms must match"
+
+index = search.InvertedIndex()
+index.add("a", {"title": "Lost Keys", "description": "blue keychain", "location": "Park"})
+index.add("b", {"title": "Found wallet", "description": "near the keyboard shop", "location": "Mall"})
+assert set(index.search("key")) == {"a", "b"}, "Last word should match as a prefix"
+assert set(index.search("key ")) == set(), "Finished words should match whole tokens only"
+scores = index.search("ke")
+assert scores["a"] > scores["b"], "Title matches should rank above description matches"
+index.remove("a")
+assert set(index.search("key")) == {"b"}
+demo = utils._demo_items()
+assert controllers.filter_items(demo, search_term="  !! ") == demo[::-1], "A term without words should not filter"
+page, total = utils.find_items(utils.build_item_query(filter_type="Found"), skip=0, limit=10)
+assert total == 0 and page == []
+page, total = utils.find_items({}, skip=10, limit=10)
+assert total == 1 and page == [], "Skip past the end should return an empty page"
+print("  ✓ Listing query push-down passed.")
+
+# =============================================
+# 12. Test Embedded Image Migration
+# =============================================
+print("Testing embedded image migration...")
+legacy_png = b"\x89PNG\r\n\x1a\n" + b"\x01" * 100
+legacy_id = utils.generate_item_id()
+db.items.insert_one({
+    "id": legacy_id,
+    "title": "Legacy Item",
+    "type": "Found",
+    "category": "Other",
+    "description": "Saved before the image store existed",
+    "location": "Archive",
+    "date": "2023-09-01",
+    "image": {"data": base64.b64encode(legacy_png).decode("utf-8"), "content_type": "image/png"},
+    "owner": "testuser",
+    "status": "Active"
+})
+assert utils.get_item_image(legacy_id) == legacy_png, "Embedded images should still be readable"
+assert utils.migrate_embedded_images() == 1
+migrated = db.items.find_one({"id": legacy_id})
+assert "data" not in migrated["image"]
+assert migrated["image"]["ref"] == hashlib.sha256(legacy_png).hexdigest()
+assert utils.get_item_image(legacy_id) == legacy_png
+assert utils.migrate_embedded_images() == 0, "Migration should be idempotent"
+utils.delete_item(legacy_id)
+assert not utils.get_image_store().exists(migrated["image"]["ref"]), "Unreferenced blobs should be removed"
+print("  ✓ Embedded image migration passed.")
+
+# =============================================
+# 13. Test Shared Listing Cache
+# =============================================
+print("Testing shared listing cache...")
+utils.invalidate_item_cache()
+before = utils.item_cache_stats()
+first = utils.load_items()
+second = utils.load_items()
+after = utils.item_cache_stats()
+assert second is first, "Repeated reads should be served from the cache"
+assert after["misses"] == before["misses"] + 1
+assert after["hits"] == before["hits"] + 1
+
+cached_id = utils.generate_item_id()
+utils.save_item({
+    "id": cached_id, "title": "Cache Probe", "type": "Found", "category": "Other",
+    "description": "Checks cache invalidation", "location": "Lab", "date": "2023-12-01",
+    "image": None, "owner": "testuser", "status": "Active"
+})
+assert any(i["id"] == cached_id for i in utils.load_items()), "save_item should invalidate the cache"
+utils.update_item_status(cached_id, "Resolved")
+assert [i for i in utils.load_items() if i["id"] == cached_id][0]["status"] == "Resolved"
+utils.delete_item(cached_id)
+assert not any(i["id"] == cached_id for i in utils.load_items()), "delete_item should invalidate the cache"
+
+# Concurrent misses share one load; a load that races an invalidation is not cached
+flight = cache.TTLCache(maxsize=8, ttl=60)
+loads = []
+release = threading.Event()
+
+def slow_load():
+    loads.append(1)
+    release.wait(5)
+    return len(loads)
+
+results = []
+readers = [threading.Thread(target=lambda: results.append(flight.get_or_load("page", slow_load)))
+           for _ in range(5)]
+for reader in readers:
+    reader.start()
+time.sleep(0.1)
+flight.invalidate("other")
+release.set()
+for reader in readers:
+    reader.join()
+assert loads == [1] and results == [1] * 5, "Concurrent misses should share one load"
+assert flight.get("page") is None, "A load that raced an invalidation should not be cached"
+assert flight.get_or_load("page", lambda: "fresh") == "fresh" and flight.get("page") == "fresh"
+print("  ✓ Shared listing cache passed.")
+
+# =============================================
+# 14. Test Incremental Item Snapshot (polling)
+# =============================================
+print("Testing incremental item snapshot...")
+snapshot = item_watcher.ItemSnapshot(db.items, projection=utils.LISTING_PROJECTION, mode="poll", poll_interval=0.2)
+snapshot.start()
+assert snapshot.wait_ready(10), "Snapshot should finish its initial load"
+assert len(snapshot.items()) == db.items.count_documents({})
+
+watched_id = utils.generate_item_id()
+utils.save_item({
+    "id": watched_id, "title": "Watched Item", "type": "Lost", "category": "Bags",
+    "description": "Picked up by the poller", "location": "Station", "date": "2023-12-02",
+    "image": image_obj, "owner": "testuser", "status": "Active"
+})
+db.items.update_one({"id": watched_id}, {"$set": {"status": "Resolved"}})
+time.sleep(1)
+watched = [i for i in snapshot.items() if i["id"] == watched_id]
+assert watched and watched[0]["status"] == "Resolved", "Poller should pick up inserts and status changes"
+assert "data" not in (watched[0]["image"] or {}), "Snapshot should keep the listing projection"
+db.items.delete_one({"id": watched_id})
+time.sleep(1)
+assert not any(i["id"] == watched_id for i in snapshot.items()), "Poller should pick up deletions"
+snapshot.stop()
+print("  ✓ Incremental item snapshot passed.")
+
+# =============================================
+# 15. Test Session Validation Cache
+# =============================================
+print("Testing session validation cache...")
+token = utils.create_session("testuser")
+assert utils.validate_session(token) == "testuser"
+before = utils.session_cache_stats()
+db.sessions.delete_many({})  # a cache hit must not need the sessions collection
+assert utils.validate_session(token) == "testuser", "Valid sessions should be served from the cache"
+assert utils.session_cache_stats()["hits"] == before["hits"] + 1
+
+utils.delete_session(token)
+assert utils.validate_session(token) is None, "delete_session should evict the cached session"
+
+expired = "expired-token"
+utils._cache_session(expired, "testuser", datetime.utcnow() + timedelta(seconds=1))
+time.sleep(1.5)
+assert utils.validate_session(expired) is None, "Expired sessions should not be served from the cache"
+print("  ✓ Session validation cache passed.")
+
+# =============================================
+# 16. Test Index Management
+# =============================================
+print("Testing index management...")
+report = indexes.apply_indexes(db)
+assert report["created"] == [] and report["errors"] == [], "Re-applying indexes should be a no-op"
+db.items.create_index("title", name="old_title")
+report = indexes.apply_indexes(db)
+assert report["undeclared"] == ["items.old_title"] and report["dropped"] == [], "Undeclared indexes are kept and listed"
+report = indexes.apply_indexes(db, prune=True)
+assert report["dropped"] == ["items.old_title"] and report["undeclared"] == []
+item_indexes = db.items.index_information()
+assert item_indexes["id_unique"]["unique"], "items.id should be uniquely indexed"
+assert "status_type_category_created_at_id" in item_indexes
+assert "owner_created_at_id" in item_indexes
+plan = str(db.items.find({"id": item_id}).explain()["queryPlanner"]["winningPlan"])
+assert "IXSCAN" in plan and "COLLSCAN" not in plan, "Lookups by id should be index-backed"
+plan = str(db.items.find({"status": "Active", "type": "Lost", "category": "Keys"})
+           .sort("created_at", -1).explain()["queryPlanner"]["winningPlan"])
+assert "IXSCAN" in plan and "SORT" not in plan.replace("SORT_KEY", ""), "Filtered listing should not sort in memory"
+usage = indexes.index_usage(db)
+assert any(u["collection"] == "items" and u["name"] == "id_unique" and u["ops"] > 0 for u in usage)
+print("  ✓ Index management passed.")
+
+# =============================================
+# 17. Test Keyset Pagination
+# =============================================
+print("Testing keyset pagination...")
+keyset_ids = []
+for n in range(5):
+    kid = utils.generate_item_id()
+    keyset_ids.append(kid)
+    utils.save_item({
+        "id": kid, "title": f"Keyset {n}", "type": "Found", "category": "Documents",
+        "description": "Paged by keyset", "location": "Office", "date": "2023-12-03",
+        "image": None, "owner": "pager", "status": "Active"
+    })
+    time.sleep(0.002)  # distinct created_at at BSON's millisecond precision
+query = utils.build_item_query(filter_category="Documents")
+seen, after = [], None
+while True:
+    page, total = utils.find_items(query, limit=2, after=after)
+    assert total == 5, "Total should count all matches regardless of position"
+    if not page:
+        break
+    seen.extend(i["id"] for i in page)
+    after = (page[-1]["created_at"], page[-1]["id"])
+assert seen == list(reversed(keyset_ids)), "Keyset pages should walk newest first without gaps or repeats"
+assert utils._item_cache.get(utils._count_cache_key(query)) == 5, "Pages of one filter should share a cached total"
+plan = str(db.items.find({"$and": [query, {"created_at": {"$lt": after[0]}}]})
+           .sort([("created_at", -1), ("id", -1)]).explain()["queryPlanner"]["winningPlan"])
+assert "IXSCAN" in plan, "Keyset pages should be index-backed"
+for kid in keyset_ids:
+    utils.delete_item(kid)
+print("  ✓ Keyset pagination passed.")
+
+# =============================================
+# 18. Test Owner-Scoped Items
+# =============================================
+print("Testing owner-scoped items...")
+owned_ids = []
+for n in range(3):
+    oid = utils.generate_item_id()
+    owned_ids.append(oid)
+    utils.save_item({
+        "id": oid, "title": f"Owned {n}", "type": "Lost", "category": "Bags",
+        "description": "Belongs to owner1", "location": "Gym", "date": "2023-12-04",
+        "image": image_obj, "owner": "owner1", "status": "Active"
+    })
+    time.sleep(0.002)  # distinct created_at at BSON's millisecond precision
+page, total = utils.load_items_by_owner("owner1", skip=0, limit=2)
+assert total == 3 and [i["id"] for i in page] == owned_ids[::-1][:2], "Owner pages should be newest first"
+assert all("data" not in (i["image"] or {}) for i in page), "Owner pages should not carry image bytes"
+assert utils.load_items_by_owner("owner1", skip=0, limit=2)[0] is page, "Owner pages should be cached"
+assert utils.load_items_by_owner("nobody")[1] == 0
+
+utils.update_item_status(owned_ids[-1], "Resolved")
+page, _ = utils.load_items_by_owner("owner1", skip=0, limit=2)
+assert page[0]["status"] == "Resolved", "The owner's writes should invalidate their cache"
+for oid in owned_ids:
+    utils.delete_item(oid)
+assert utils.load_items_by_owner("owner1") == ([], 0)
+plan = str(db.items.find({"owner": "owner1"}).sort([("created_at", -1), ("id", -1)])
+           .explain()["queryPlanner"]["winningPlan"])
+assert "owner_created_at_id" in plan, "Owner queries should use the owner index"
+print("  ✓ Owner-scoped items passed.")
+
+# =============================================
+# 19. Test Precomputed Date and Search Fields
+# =============================================
+print("Testing precomputed date and search fields...")
+assert search.tokenize("Café Zürich Straße") == ["cafe", "zurich", "strasse"]
+dated_id = utils.generate_item_id()
+utils.save_item({
+    "id": dated_id, "title": "Café Umbrella", "type": "Lost", "category": "Other",
+    "description": "Left at the café", "location": "Zürich", "date": "2023-12-05",
+    "image": None, "owner": "testuser", "status": "Active"
+})
+stored = db.items.find_one({"id": dated_id})
+assert stored["date_value"] == datetime(2023, 12, 5), "save_item should store a native date"
+assert "cafe" in stored["search_tokens"] and "zurich" in stored["search_tokens"]
+query = utils.build_item_query(search_term="cafe", date_from=datetime(2023, 12, 5).date(),
+                               date_to=datetime(2023, 12, 5).date())
+page, total = utils.find_items(query, limit=10)
+assert total == 1 and page[0]["id"] == dated_id, "Accented text should match unaccented search"
+query = utils.build_item_query(date_from=datetime(2023, 12, 6).date(), date_to=datetime(2023, 12, 31).date())
+assert all(i["id"] != dated_id for i in utils.find_items(query, limit=50)[0])
+
+db.items.update_one({"id": dated_id}, {"$unset": {"date_value": "", "search_tokens": ""}})
+# Until backfilled, a legacy item is still listed by date range and prefix search
+query = utils.build_item_query(search_term="umbr", date_from=datetime(2024, 1, 1).date(),
+                               date_to=datetime(2024, 1, 31).date())
+page, total = utils.find_items(query, limit=10)
+assert total == 1 and page[0]["id"] == dated_id, "Items without derived fields must not disappear"
+assert utils.find_items(utils.build_item_query(search_term="brella"), limit=10)[1] == 0, "Fallback matches word prefixes"
+assert utils.backfill_derived_fields() == 1
+assert db.items.find_one({"id": dated_id})["date_value"] == datetime(2023, 12, 5)
+assert utils.backfill_derived_fields() == 0, "Backfill should be idempotent"
+utils.delete_item(dated_id)
+print("  ✓ Precomputed date and search fields passed.")
+
+# =============================================
+# 20. Test Columnar Listing Index
+# =============================================
+print("Testing columnar listing index...")
+listing = [
+    models.Item("c1", "Keys", "Lost", "Keys", "", "", "2023-12-01", date_value=datetime(2023, 12, 1)),
+    models.Item("c2", "Phone", "Found", "Electronics", "", "", "2023-12-10", status="Resolved"),
+    models.Item("c3", "Bag", "Lost", "Bags", "", "", "not a date"),
+]
+columns = listing_index.get_columns(listing)
+assert listing_index.get_columns(listing) is columns, "Columns should be reused for the same list"
+assert columns.mask(filter_type="Lost").tolist() == [True, False, True]
+assert columns.mask(filter_status="Resolved").tolist() == [False, True, False]
+assert columns.mask(filter_category="Unknown").tolist() == [False, False, False]
+window = columns.mask(date_from=datetime(2023, 12, 5).date(), date_to=datetime(2023, 12, 31).date())
+assert window.tolist() == [False, True, True], "Unparseable dates should not be excluded by a date range"
+assert columns.mask(ids={"c3": 1.0, "gone": 2.0}).tolist() == [False, False, True]
+rows = columns.memoize("rows", {"filter_type": "Lost"}, lambda: [0, 2])
+assert columns.memoize("rows", {"filter_type": "Lost"}, lambda: []) is rows, "Results should be memoised per signature"
+for n in range(listing_index.MEMO_SIZE):
+    columns.memoize("rows", {"search_term": f"term {n}"}, lambda: [n])
+assert len(columns._memo) == listing_index.MEMO_SIZE, "The memo should stay bounded"
+assert columns.memoize("rows", {"filter_type": "Lost"}, lambda: []) == [], "Least recently used results are evicted"
+print("  ✓ Columnar listing index passed.")
+
+# =============================================
+# 21. Test Facet Counts
+# =============================================
+print("Testing facet counts...")
+facet_filters = {"search_term": "", "filter_type": "Lost", "filter_status": "All",
+                 "filter_category": "All", "date_from": None, "date_to": None}
+facets = columns.facets(facet_filters)
+assert facets["type"] == {"All": 3, "Lost": 2, "Found": 1}, "A dimension ignores its own filter"
+assert facets["category"]["Keys"] == 1 and facets["category"]["Electronics"] == 0
+assert columns.facets(facet_filters) is facets, "Facets should be cached per filter signature"
+real_facet_counts, utils.facet_counts = utils.facet_counts, lambda **filters: None
+try:
+    # Falls back to the image-free listings, where a term without words is no search
+    counts = controllers.facet_counts({**facet_filters, "filter_type": "All", "search_term": "  "})
+    assert counts["type"]["All"] == len(utils.load_items(include_images=False))
+finally:
+    utils.facet_counts = real_facet_counts
+
+facet_ids = []
+for n, (itype, category) in enumerate([("Lost", "Keys"), ("Lost", "Bags"), ("Found", "Keys")]):
+    fid = utils.generate_item_id()
+    facet_ids.append(fid)
+    utils.save_item({
+        "id": fid, "title": f"Facet {n}", "type": itype, "category": category,
+        "description": "Counted by facets", "location": "Hall", "date": "2023-12-06",
+        "image": None, "owner": "faceter", "status": "Active"
+    })
+counts = utils.facet_counts(search_term="facet", filter_type="Lost")
+assert counts["type"] == {"All": 3, "Lost": 2, "Found": 1}
+assert counts["category"] == {"All": 2, "Keys": 1, "Bags": 1}
+assert counts["status"] == {"All": 2, "Active": 2}
+assert utils.facet_counts(search_term="facet", filter_type="Lost") is counts, "Facets should be cached"
+utils.update_item_status(facet_ids[0], "Resolved")
+assert utils.facet_counts(search_term="facet", filter_type="Lost")["status"] == {"All": 2, "Active": 1, "Resolved": 1}
+for fid in facet_ids:
+    utils.delete_item(fid)
+print("  ✓ Facet counts passed.")
+
+# =============================================
+# 22. Test Lost/Found Matching
+# =============================================
+print("Testing Lost/Found matching...")
+sig = matching.minhash(matching.shingles("black phone blue case"))
+assert matching.signature_similarity(sig, sig) == 1.0
+assert matching.signature_similarity(sig, matching.minhash(matching.shingles("red umbrella"))) < 0.2
+
+lost_id, found_id, far_id = utils.generate_item_id(), utils.generate_item_id(), utils.generate_item_id()
+for mid, itype, owner, date in [(lost_id, "Lost", "loser", "2024-03-01"),
+                                (found_id, "Found", "finder", "2024-03-03"),
+                                (far_id, "Found", "finder", "2024-05-01")]:
+    utils.save_item({
+        "id": mid, "title": f"{itype} phone", "type": itype, "category": "Electronics",
+        "description": "Black phone with a cracked screen and blue case", "location": "Central Park",
+        "date": date, "image": None, "owner": owner, "status": "Active"
+    })
+deadline = time.time() + 10
+while time.time() < deadline and not utils.get_item_matches([lost_id])[lost_id]:
+    time.sleep(0.2)
+found_matches = utils.get_item_matches([lost_id, found_id, far_id])
+assert [m[0].id for m in found_matches[lost_id]] == [found_id], "Matching should run after save_item"
+assert [m[0].id for m in found_matches[found_id]] == [lost_id], "Matches should show on both items"
+assert found_matches[far_id] == [], "Items months apart should not be candidates"
+assert utils.match_all_items() == 1, "Re-matching should upsert, not duplicate"
+assert db.matches.count_documents({}) == 1
+plan = str(db.items.find({"category": "Electronics", "type": "Found", "status": {"$in": ["Active", None]},
+                          "match_bucket": {"$in": [1, 2]}}).explain()["queryPlanner"]["winningPlan"])
+assert "category_type_status_match_bucket" in plan, "Candidates should come from the blocking index"
+utils.update_item_status(found_id, "Resolved")
+assert db.matches.count_documents({}) == 0, "Resolving an item should drop its matches"
+assert utils.get_item_matches([lost_id, found_id]) == {lost_id: [], found_id: []}
+utils.update_item_status(found_id, "Active")
+deadline = time.time() + 10
+while time.time() < deadline and not utils.get_item_matches([lost_id])[lost_id]:
+    time.sleep(0.2)
+assert [m[0].id for m in utils.get_item_matches([lost_id])[lost_id]] == [found_id], "Reopening should re-match"
+for mid in (lost_id, found_id, far_id):
+    utils.delete_item(mid)
+assert db.matches.count_documents({}) == 0, "Deleting an item should drop its matches"
+print("  ✓ Lost/Found matching passed.")
+
+# =============================================
+# 23. Test Near-Duplicate Detection
+# =============================================
+print("Testing near-duplicate detection...")
+original = {
+    "id": utils.generate_item_id(), "title": "test1", "type": "Lost", "category": "Wallet/Purse",
+    "description": "Black leather wallet with cards, lost near the station entrance", "location": "Station",
+    "date": "2024-02-15", "image": image_obj, "owner": "poster", "status": "Active"
+}
+utils.save_item(dict(original))
+repost = dict(original, id=utils.generate_item_id(), image=None,
+              description="Black leather wallet with cards, lost near the station entrance!")
+assert utils.find_duplicate(repost)["id"] == original["id"], "Reworded reposts should be detected"
+same_image = dict(original, id=utils.generate_item_id(), description="Completely different words here")
+assert utils.find_duplicate(same_image)["id"] == original["id"], "Reposting the same image should be detected"
+other = dict(original, id=utils.generate_item_id(), image=None, description="Red umbrella left on the bus")
+assert utils.find_duplicate(other) is None
+assert utils.find_duplicate(dict(repost, owner="someone_else")) is None, "Only the poster's own items count"
+plan = str(db.items.find({"owner": "poster", "duplicate_keys": {"$in": ["img:x"]}})
+           .explain()["queryPlanner"]["winningPlan"])
+assert "owner_duplicate_keys" in plan, "Duplicate lookups should be index-backed"
+utils.update_item_status(original["id"], "Resolved")
+assert utils.find_duplicate(repost) is None, "Resolved items can be posted again"
+utils.delete_item(original["id"])
+print("  ✓ Near-duplicate detection passed.")
+
+# =============================================
+# 24. Test One Script Run per UI Action
+# =============================================
+print("Testing one script run per UI action...")
+
+
+class _FakeStreamlit:
+    """Stands in for streamlit inside controllers, counting st.rerun() calls"""
+
+    def __init__(self):
+        self.session_state = {}
+        self.reruns = 0
+        self.messages = []
+
+    def rerun(self, *args, **kwargs):
+        self.reruns += 1
+
+    def error(self, text):
+        self.messages.append(("error", text))
+
+    def success(self, text):
+        self.messages.append(("success", text))
+
+    def toast(self, text, **kwargs):
+        self.messages.append(("toast", text))
+
+
+class _FakeCookies(dict):
+    def set(self, key, value, **kwargs):
+        self[key] = value
+
+    def delete(self, key):
+        del self[key]
+
+
+fake_st, cookies = _FakeStreamlit(), _FakeCookies()
+real_st, controllers.st = controllers.st, fake_st
+try:
+    controllers.initialize_session_state()
+    state = fake_st.session_state
+    state.update(login_user="testuser", login_pass="password123",
+                 reg_user="clicker", reg_pass="password123", reg_contact="clicker@example.com",
+                 post_title="Rerun Probe", post_type="Found", post_category="Bags",
+                 post_description="Posted from a callback", post_location="Desk",
+                 post_date=datetime(2024, 4, 1).date(), post_image=None)
+    actions = [
+        ("show login", lambda: controllers.handle_show_auth("login")),
+        ("register", controllers.handle_register),
+        ("login", lambda: controllers.handle_login(cookies)),
+        ("post item", controllers.handle_post_item_click),
+    ]
+    for name, action in actions:
+        action()
+        assert fake_st.reruns == 0, f"{name} should not trigger a second script run"
+    assert state["user"] == "testuser" and state["menu"] == "Home" and "session_token" in cookies
+    assert state["post_title"] == "", "A successful post should clear the form"
+    posted = db.items.find_one({"title": "Rerun Probe"})
+    actions = [
+        ("resolve", lambda: controllers.handle_update_item_status(posted["id"], "Resolved")),
+        ("confirm delete", lambda: controllers.handle_confirm_delete(posted["id"], True)),
+        ("delete", lambda: controllers.handle_delete_item(posted["id"])),
+        ("my items page", lambda: controllers.handle_my_items_page(2)),
+        ("next page", lambda: controllers.go_to_next_page("cursor")),
+        ("previous page", controllers.go_to_previous_page),
+        ("logout", lambda: controllers.handle_logout(cookies)),
+    ]
+    for name, action in actions:
+        action()
+        assert fake_st.reruns == 0, f"{name} should not trigger a second script run"
+    assert db.items.count_documents({"title": "Rerun Probe"}) == 0
+    assert f"confirm_del_{posted['id']}" not in state and state["page_cursors"] == [None]
+    assert state["user"] is None and "session_token" not in cookies
+
+    state.update(login_pass="wrong")
+    controllers.handle_login(cookies)
+    assert state.pop("flash") == ("error", "Invalid username or password") and fake_st.reruns == 0
+finally:
+    controllers.st = real_st
+print("  ✓ One script run per UI action passed.")
+
+# =============================================
+# 25. Test Async Data Layer
+# =============================================
+print("Testing async data layer...")
+runner = async_runner.BackgroundLoop(max_concurrency=2, name="async-test")
+in_flight = {"now": 0, "peak": 0}
+
+async def probe(n):
+    in_flight["now"] += 1
+    in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+    await asyncio.sleep(0.01)
+    in_flight["now"] -= 1
+    return n
+
+assert runner.gather(*(probe(n) for n in range(6))) == list(range(6)), "Results should keep their order"
+assert in_flight["peak"] == 2, "gather should respect max_concurrency"
+assert runner.run(probe(7)) == 7
+
+async_id = utils.generate_item_id()
+utils.run_async(utils.save_item_async({
+    "id": async_id, "title": "Async Umbrella", "type": "Found", "category": "Other",
+    "description": "Green umbrella left on the tram", "location": "Tram 4", "date": "2023-12-07",
+    "image": None, "owner": "async_user", "status": "Active"
+}))
+assert db.items.find_one({"id": async_id})["search_tokens"], "Async save should precompute fields"
+async_query = utils.build_item_query(search_term="umbrella")
+async_page, async_counts = utils.run_concurrently(
+    utils.find_items_async(async_query),
+    utils.facet_counts_async(search_term="umbrella"),
+)
+assert [item.id for item in async_page[0]] == [async_id] and async_page[1] == 1
+assert async_counts["type"] == {"All": 1, "Found": 1}
+assert utils.find_items(async_query) is async_page, "Async reads should fill the shared cache"
+utils.invalidate_item_cache()
+assert [item.id for item in utils.find_items(async_query)[0]] == [async_id]
+assert utils.facet_counts(search_term="umbrella") == async_counts, "Async and sync facets should agree"
+
+utils.register_user("async_user", "Password123", "async@example.com")
+async_token = utils.create_session("async_user")
+utils._session_cache.clear()
+utils._contact_cache.clear()
+utils.invalidate_item_cache()
+# One render's reads: listings, facets, contacts and the session check at once
+items, counts, contacts, session_user = utils.run_concurrently(
+    utils.load_items_async(include_images=False),
+    utils.facet_counts_async(search_term="umbrella"),
+    utils.get_user_contacts_async(["async_user", "nobody_async"]),
+    utils.validate_session_async(async_token),
+)
+assert async_id in {item.id for item in items} and counts == async_counts
+assert utils.load_items(include_images=False) is items, "Async listings should fill the shared cache"
+assert contacts == {"async_user": "async@example.com", "nobody_async": "No contact info"}
+assert session_user == "async_user"
+assert utils.validate_session(async_token) == "async_user" and utils._session_cache.get(
+    utils._session_cache_key(async_token)) is not None, "Async session checks should fill the session cache"
+assert utils.get_user_contact("async_user") == "async@example.com"
+assert utils.run_async(utils.get_user_contact_async("async_user")) == "async@example.com"
+assert utils.run_async(utils.validate_session_async("not-a-token")) is None
+
+real_breaker = utils._db_breaker
+utils._db_breaker = connection.CircuitBreaker(base_delay=60.0)
+try:
+    utils._db_breaker.record_failure()
+    utils._contact_cache.clear()
+    utils.invalidate_item_cache()
+    assert [item.id for item in utils.run_async(utils.load_items_async())] == ["demo001", "demo002"], \
+        "An open breaker should fall back to demo listings"
+    assert utils.run_async(utils.get_user_contact_async("async_user")) == "Contact info unavailable"
+finally:
+    utils._db_breaker = real_breaker
+
+utils.run_async(utils.update_item_status_async(async_id, "Resolved"))
+assert db.items.find_one({"id": async_id})["status"] == "Resolved"
+assert utils.facet_counts(search_term="umbrella")["status"] == {"All": 1, "Resolved": 1}
+utils.run_async(utils.delete_item_async(async_id))
+assert db.items.find_one({"id": async_id}) is None
+assert utils.run_async(utils.find_items_async(async_query))[1] == 0
+utils.delete_session(async_token)
+assert utils.db_readable(), "The test database should be reachable"
+print("  ✓ Async data layer passed.")
+
+# =============================================
+# 26. Test Bulk Import and Export
+# =============================================
+print("Testing bulk import and export...")
+assert list(bulk_io.iter_records(io.StringIO('[{"a": 1},\n {"a": 2}]'), chunk_size=3)) == [{"a": 1}, {"a": 2}]
+assert list(bulk_io.iter_records(io.StringIO('{"a": 1}\n{"a": 2}\n'), chunk_size=3)) == [{"a": 1}, {"a": 2}]
+
+batches = []
+with open(os.path.join("data", "items.json"), encoding="utf-8") as f:
+    stats = utils.import_items(bulk_io.iter_records(f), batch_size=1, on_batch=lambda s: batches.append(dict(s)))
+assert stats == {"inserted": 2, "skipped": 0, "failed": 0} and len(batches) == 2
+imported = db.items.find_one({"id": "3778e11c"})
+with open(os.path.join("data", "images", "20260215212435_b1a0ffeb.jpg"), "rb") as f:
+    assert imported["image"]["ref"] == hashlib.sha256(f.read()).hexdigest(), "image_path should be stored"
+assert imported["date_value"] == datetime(2026, 2, 15) and imported["search_tokens"] and imported["duplicate_keys"]
+assert "image_path" not in imported and imported["created_at"]
+assert f"img:{imported['image']['ref']}" in imported["duplicate_keys"], "Imported images should be duplicate keys"
+image_key = imported["image"]["ref"]
+holds = utils._image_keys(imported["image"]).count(image_key)  # original plus small-image thumbnails
+refs_before = db.image_refs.find_one({"_id": image_key})["refs"]
+with open(os.path.join("data", "items.json"), encoding="utf-8") as f:
+    assert utils.import_items(bulk_io.iter_records(f))["skipped"] == 2, "Re-import should skip existing ids"
+assert db.image_refs.find_one({"_id": image_key})["refs"] == refs_before, "Skipped records must not retain images"
+
+shared = {"title": "Shared photo", "type": "Found", "category": "Other", "date": "2026-02-16",
+          "image_path": "data\\images\\20260215212435_b1a0ffeb.jpg", "owner": "test"}
+records = [
+    {**shared, "id": "shared01"},
+    {**shared, "id": "baddate1", "created_at": "not a date"},
+    {**shared, "id": "badimg01", "image_path": None, "image": {"data": "not base64!"}},
+    "not a record",
+    {**shared, "id": "shared02"},
+    {**shared, "id": "shared02"},  # duplicate id inside one batch: rejected by the server
+]
+stats = utils.import_items(records, batch_size=10)
+assert stats == {"inserted": 2, "skipped": 1, "failed": 3}, "Bad records should be counted, not abort the import"
+assert db.items.count_documents({"id": {"$in": ["baddate1", "badimg01"]}}) == 0
+assert db.image_refs.find_one({"_id": image_key})["refs"] == refs_before + 2 * holds, \
+    "Each imported item holds one reference; duplicates release theirs"
+for iid in ("shared01", "shared02"):
+    utils.delete_item(iid)
+assert db.image_refs.find_one({"_id": image_key})["refs"] == refs_before
+
+with open(os.path.join("data", "users.json"), encoding="utf-8") as f:
+    assert utils.import_users(bulk_io.iter_records(f))["inserted"] == 1
+assert utils.get_user_contact("test") == "test@gmail.com"
+
+export = io.StringIO()
+assert bulk_io.write_records(utils.iter_export_items(batch_size=1), export, "json") == db.items.count_documents({})
+exported = {r["id"]: r for r in bulk_io.iter_records(io.StringIO(export.getvalue())) if r["id"] in ("3778e11c", "66bca8e9")}
+assert len(exported) == 2 and "search_tokens" not in exported["3778e11c"]
+copies = [{**record, "id": record["id"] + "-copy"} for record in exported.values()]
+assert utils.import_items(copies)["inserted"] == 2, "Exports should re-import"
+reimported = db.items.find_one({"id": "3778e11c-copy"})
+assert reimported["image"]["ref"] == imported["image"]["ref"] and reimported["search_tokens"]
+assert f"img:{imported['image']['ref']}" in reimported["duplicate_keys"]
+assert abs(reimported["created_at"] - imported["created_at"]) < timedelta(milliseconds=1), "created_at should survive"
+for iid in exported:
+    utils.delete_item(iid)
+assert utils.get_image_store().exists(image_key), "Re-imported items hold their own image references"
+missing = {**copies[0], "id": "ghostimg", "image": {"ref": "0" * 64, "content_type": "image/jpeg"}}
+assert utils.import_items([missing]) == {"inserted": 0, "skipped": 0, "failed": 1}, "Refs must exist in the store"
+for record in copies:
+    utils.delete_item(record["id"])
+assert not utils.get_image_store().exists(image_key)
+db.users.delete_one({"username": "test"})
+print("  ✓ Bulk import and export passed.")
+
+# =============================================
+# 27. Test Image Reference Counting
+# =============================================
+print("Testing image reference counting...")
+try:
+    image_store.ImageStore()
+    raise AssertionError("ImageStore should be abstract")
+except TypeError:
+    pass
+
+shared_png = b"\x89PNG\r\n\x1a\n" + b"\x02" * 100
+first = utils.store_image_bytes(shared_png, "image/png")
+second = utils.store_image_bytes(shared_png, "image/png")
+assert db.image_refs.find_one({"_id": first["ref"]})["refs"] == 2
+store = utils.get_image_store()
+utils.discard_uploaded_image(first)
+assert store.exists(first["ref"]), "A blob still referenced by another upload should stay"
+utils.discard_uploaded_image(second)
+assert not store.exists(first["ref"]) and db.image_refs.find_one({"_id": first["ref"]}) is None
+
+# An identical upload retains the blob between the release and the delete
+raced = utils.store_image_bytes(shared_png, "image/png")
+# Patched on the class: the GridFS backend hands out a new store per call
+store_class = type(store)
+real_delete = store_class.delete
+
+def racing_delete(self, key):
+    utils._retain_blob(db, key)
+    real_delete(self, key)
+
+store_class.delete = racing_delete
+try:
+    utils.discard_uploaded_image(raced)
+finally:
+    store_class.delete = real_delete
+assert store.get(raced["ref"]) == shared_png, "A blob retained during its delete should be restored"
+utils.discard_uploaded_image(raced)
+assert not store.exists(raced["ref"])
+print("  ✓ Image reference counting passed.")
+
+# =============================================
+# 28. Test Thumbnails
+# =============================================
+print("Testing thumbnails...")
+
+
+def png_bytes(width, height):
+    out = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 30, 30)).save(out, format="PNG")
+    return out.getvalue()
+
+
+wide_png = png_bytes(1000, 500)
+thumb = image_store.make_thumbnail(wide_png, 400)
+with Image.open(io.BytesIO(thumb)) as img:
+    assert img.size == (400, 200) and img.format == "PNG", "Thumbnails keep aspect ratio and format"
+assert image_store.make_thumbnail(png_bytes(120, 80), 200) is None, "Small images are served as is"
+
+blobs = image_store.BlobCache(max_bytes=10)
+blobs.put("a", b"aaaa")
+blobs.put("b", b"bbbb")
+assert blobs.get("a") == b"aaaa"
+blobs.put("c", b"cccc")
+assert blobs.get("b") is None, "The least recently used blob should be evicted"
+assert blobs.get("a") == b"aaaa" and blobs.get("c") == b"cccc"
+blobs.put("big", b"x" * 11)
+assert blobs.get("big") is None, "Blobs larger than the budget are not cached"
+
+# Legacy item: original in the store, thumbnails generated on first request
+store = utils.get_image_store()
+legacy_ref = image_store.content_key(wide_png)
+utils._retain_blob(db, legacy_ref)
+store.put(wide_png, "image/png")
+thumb_item_id = utils.generate_item_id()
+db.items.insert_one({
+    "id": thumb_item_id, "title": "Pre-thumbnail Item", "type": "Found", "category": "Other",
+    "description": "Uploaded before thumbnails", "location": "Archive", "date": "2023-09-02",
+    "image": {"ref": legacy_ref, "content_type": "image/png", "size": len(wide_png)},
+    "owner": "testuser", "status": "Active"
+})
+cached_listing = utils.load_items(include_images=False)
+small = utils.get_item_image(thumb_item_id, size="small")
+with Image.open(io.BytesIO(small)) as img:
+    assert max(img.size) == utils.THUMBNAIL_SIZES["small"]
+stored_thumbs = db.items.find_one({"id": thumb_item_id})["image"]["thumbnails"]
+assert stored_thumbs == {"small": image_store.content_key(small)}
+assert utils.get_item_image(thumb_item_id, size="small") == small
+assert utils.load_items(include_images=False) is cached_listing, "Lazy thumbnails should keep cached listings"
+utils.delete_item(thumb_item_id)
+assert not store.exists(legacy_ref) and not store.exists(stored_thumbs["small"]), "Deletes release thumbnails"
+
+upload = utils.store_image_bytes(wide_png, "image/png")
+assert set(upload["thumbnails"]) == set(utils.THUMBNAIL_SIZES)
+# A card passes its listing's image reference: no item lookup (the id does not even exist)
+card = utils.get_item_image("not-an-item", size="card", image=upload)
+assert card == store.get(upload["thumbnails"]["card"]) and utils._thumbnail_cache.get(upload["thumbnails"]["card"]) == card
+assert utils.get_item_image("not-an-item", image=upload) == wide_png
+assert utils.get_item_image(thumb_item_id, size="small", image={"ref": legacy_ref}) is None, \
+    "Without a stored thumbnail key the item is looked up by id"
+utils.discard_uploaded_image(upload)
+assert not any(store.exists(key) for key in [upload["ref"], *upload["thumbnails"].values()])
+print("  ✓ Thumbnails passed.")
+
+# =============================================
+# 29. Test Circuit Breaker
+# =============================================
+print("Testing circuit breaker...")
+now = [100.0]
+breaker = connection.CircuitBreaker(base_delay=1.0, max_delay=8.0, clock=lambda: now[0])
+assert breaker.state == "closed" and breaker.allow() and breaker.allow()
+breaker.record_failure()
+assert breaker.state == "open" and not breaker.allow()
+now[0] += 1.0
+assert breaker.state == "half-open"
+assert breaker.allow(), "First caller after the backoff gets the trial"
+assert not breaker.allow() and not breaker.allow(), "Others wait while the trial runs"
+breaker.record_failure()
+assert breaker.state == "open" and not breaker.allow()
+now[0] += 1.0
+assert breaker.state == "open", "A failed trial doubles the backoff"
+now[0] += 1.0
+assert breaker.allow() and not breaker.allow()
+breaker.record_success()
+assert breaker.state == "closed" and breaker.allow() and breaker.allow()
+
+real_breaker = utils._db_breaker
+utils._db_breaker = connection.CircuitBreaker(base_delay=1.0, clock=lambda: now[0])
+try:
+    utils._db_breaker.record_failure()
+    assert _original_get_db() is None, "get_db fails fast while the breaker is open"
+    now[0] += 1.0
+    assert utils._db_breaker.allow()  # another caller holds the trial
+    assert _original_get_db() is None
+    utils._db_breaker.record_failure()
+    now[0] += 2.0
+    assert _original_get_db().client is db.client, "A trial against a readable server returns the database"
+    assert utils._db_breaker.state == "closed" and utils.db_health()["failures"] == 0
+finally:
+    utils._db_breaker = real_breaker
+print("  ✓ Circuit breaker passed.")
+
 # =============================================
 # Cleanup: Drop test database
 # =============================================
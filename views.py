@@ -6,15 +6,23 @@ import streamlit as st
 import base64
 from datetime import datetime, timedelta
 import extra_streamlit_components as stx
-from models import CATEGORIES, ITEMS_PER_PAGE, FILTER_TYPES, FILTER_STATUSES, FILTER_CATEGORIES
+from models import CATEGORIES, ITEM_TYPES, ITEMS_PER_PAGE, FILTER_TYPES, FILTER_STATUSES, FILTER_CATEGORIES
 import utils
 import controllers
 
 
-def render_image(image_obj, **kwargs):
-    """Render image from base64 encoded data or show placeholder"""
-    if image_obj and isinstance(image_obj, dict) and image_obj.get("data"):
-        img_bytes = base64.b64decode(image_obj["data"])
+def render_image(item, size=None, **kwargs):
+    """Render an item's image (or a thumbnail size), fetching the bytes lazily, or show placeholder"""
+    image_obj = item.get("image")
+    img_bytes = None
+    if image_obj and isinstance(image_obj, dict):
+        if image_obj.get("data"):
+            img_bytes = base64.b64decode(image_obj["data"])
+        else:
+            # Listing queries project the image data out; load it for this card only,
+            # by the listing's blob keys so cached thumbnails skip the item lookup
+            img_bytes = utils.get_item_image(item["id"], size=size, image=image_obj)
+    if img_bytes:
         st.image(img_bytes, **kwargs)
     else:
         st.text("No Image")
@@ -72,8 +80,8 @@ def render_navbar(cookie_manager):
                 </div>
                 """, unsafe_allow_html=True)
                 st.divider()
-                if st.button("🚪 Logout", key="nav_logout", use_container_width=True, type="primary"):
-                    controllers.handle_logout(cookie_manager)
+                st.button("🚪 Logout", key="nav_logout", use_container_width=True, type="primary",
+                          on_click=controllers.handle_logout, args=(cookie_manager,))
     else:
         # Brand | spacer | 🌙 | Sign In | Sign Up
         cols = st.columns([3, 3, 0.5, 1, 1])
@@ -92,13 +100,19 @@ def render_navbar(cookie_manager):
                 help="Toggle dark/light mode"
             )
         with cols[3]:
-            if st.button("Sign In", key="nav_signin", use_container_width=True):
-                st.session_state["show_auth"] = "login"
-                st.rerun()
+            st.button("Sign In", key="nav_signin", use_container_width=True,
+                      on_click=controllers.handle_show_auth, args=("login",))
         with cols[4]:
-            if st.button("Sign Up", key="nav_signup", use_container_width=True, type="primary"):
-                st.session_state["show_auth"] = "register"
-                st.rerun()
+            st.button("Sign Up", key="nav_signup", use_container_width=True, type="primary",
+                      on_click=controllers.handle_show_auth, args=("register",))
+
+
+def render_flash():
+    """Show the message a callback queued with controllers.flash, once"""
+    message = st.session_state.pop("flash", None)
+    if message is not None:
+        kind, text = message
+        {"success": st.success, "warning": st.warning}.get(kind, st.error)(text)
 
 
 def render_auth_form(cookie_manager):
@@ -112,168 +126,251 @@ def render_auth_form(cookie_manager):
         st.markdown("---")
         if mode == "login":
             st.subheader("🔑 Sign In")
-            username = st.text_input("Username", key="login_user")
-            password = st.text_input("Password", type="password", key="login_pass")
+            render_flash()
+            st.text_input("Username", key="login_user")
+            st.text_input("Password", type="password", key="login_pass")
             c1, c2 = st.columns(2)
             with c1:
-                if st.button("Login", type="primary", use_container_width=True):
-                    controllers.handle_login(username, password, cookie_manager)
+                st.button("Login", type="primary", use_container_width=True,
+                          on_click=controllers.handle_login, args=(cookie_manager,))
             with c2:
-                if st.button("Cancel", key="cancel_login", use_container_width=True):
-                    st.session_state["show_auth"] = None
-                    st.rerun()
+                st.button("Cancel", key="cancel_login", use_container_width=True,
+                          on_click=controllers.handle_show_auth, args=(None,))
             st.caption("Don't have an account?")
-            if st.button("Create one →", key="switch_register"):
-                st.session_state["show_auth"] = "register"
-                st.rerun()
+            st.button("Create one →", key="switch_register",
+                      on_click=controllers.handle_show_auth, args=("register",))
             st.markdown("")
-            if st.button("🏠 Back to Home", key="home_login", use_container_width=True):
-                st.session_state["show_auth"] = None
-                st.rerun()
+            st.button("🏠 Back to Home", key="home_login", use_container_width=True,
+                      on_click=controllers.handle_show_auth, args=(None,))
         else:
             st.subheader("📝 Sign Up")
-            new_user = st.text_input("Username", key="reg_user")
-            new_pass = st.text_input("Password", type="password", key="reg_pass")
-            contact = st.text_input("Contact (Email / Phone)", key="reg_contact")
+            render_flash()
+            st.text_input("Username", key="reg_user")
+            st.text_input("Password", type="password", key="reg_pass")
+            st.text_input("Contact (Email / Phone)", key="reg_contact")
             c1, c2 = st.columns(2)
             with c1:
-                if st.button("Register", type="primary", use_container_width=True):
-                    controllers.handle_register(new_user, new_pass, contact)
+                st.button("Register", type="primary", use_container_width=True,
+                          on_click=controllers.handle_register)
             with c2:
-                if st.button("Cancel", key="cancel_reg", use_container_width=True):
-                    st.session_state["show_auth"] = None
-                    st.rerun()
+                st.button("Cancel", key="cancel_reg", use_container_width=True,
+                          on_click=controllers.handle_show_auth, args=(None,))
             st.caption("Already have an account?")
-            if st.button("Sign in →", key="switch_login"):
-                st.session_state["show_auth"] = "login"
-                st.rerun()
+            st.button("Sign in →", key="switch_login",
+                      on_click=controllers.handle_show_auth, args=("login",))
             st.markdown("")
-            if st.button("🏠 Back to Home", key="home_reg", use_container_width=True):
-                st.session_state["show_auth"] = None
-                st.rerun()
+            st.button("🏠 Back to Home", key="home_reg", use_container_width=True,
+                      on_click=controllers.handle_show_auth, args=(None,))
         st.markdown("---")
     return True
 
 
+def _facet_label(counts):
+    """format_func showing an option with its result count, e.g. Electronics (1,240)"""
+    return lambda option: f"{option} ({counts.get(option, 0):,})"
+
+
 def render_home_page(public=False):
     """Render home page with item listings and filters"""
     st.header("Latest Listings")
+    render_listings(public)
+
+
+@st.fragment
+def render_listings(public=False):
+    """Filter bar, results and pagination.
+
+    A fragment: changing a filter or flipping a page re-executes only this
+    part of the page, not the navbar, theme or the rest of the script.
+    """
+    # The widgets keep their values in session state, so the counts for the
+    # current filters are known before the dropdowns are drawn
+    default_from = (datetime.today() - timedelta(days=90)).date()
+    default_to = datetime.today().date()
+    current = {
+        "search_term": st.session_state.get("search_term", ""),
+        "filter_type": st.session_state.get("filter_type", "All"),
+        "filter_status": st.session_state.get("filter_status", "All"),
+        "filter_category": st.session_state.get("filter_category", "All"),
+        "date_from": st.session_state.get("date_from", default_from),
+        "date_to": st.session_state.get("date_to", default_to),
+    }
+    # Counts and the page below are fetched together, then read from the cache
+    controllers.prefetch_listings(current)
+    counts = controllers.facet_counts(current)
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        search_term = st.text_input("Search (Title/Description/Location)")
+        search_term = st.text_input("Search (Title/Description/Location)", key="search_term")
     with col2:
-        filter_type = st.selectbox("Filter by Type", FILTER_TYPES)
+        filter_type = st.selectbox("Filter by Type", FILTER_TYPES, key="filter_type",
+                                   format_func=_facet_label(counts["type"]))
     with col3:
-        filter_category = st.selectbox("Filter by Category", FILTER_CATEGORIES)
+        filter_category = st.selectbox("Filter by Category", FILTER_CATEGORIES, key="filter_category",
+                                       format_func=_facet_label(counts["category"]))
 
     col4, col5, col6 = st.columns(3)
     with col4:
-        filter_status = st.selectbox("Filter by Status", FILTER_STATUSES)
+        filter_status = st.selectbox("Filter by Status", FILTER_STATUSES, key="filter_status",
+                                     format_func=_facet_label(counts["status"]))
     with col5:
-        date_from = st.date_input("From Date", datetime.today() - timedelta(days=90), key="date_from")
+        date_from = st.date_input("From Date", default_from, key="date_from")
     with col6:
-        date_to = st.date_input("To Date", datetime.today(), key="date_to")
-
-    items = utils.load_items()
-    filtered_items = controllers.filter_items(
-        items,
-        search_term=search_term,
-        filter_type=filter_type,
-        filter_status=filter_status,
-        filter_category=filter_category,
-        date_from=date_from,
-        date_to=date_to
-    )
+        date_to = st.date_input("To Date", default_to, key="date_to")
+
+    filters = {
+        "search_term": search_term,
+        "filter_type": filter_type,
+        "filter_status": filter_status,
+        "filter_category": filter_category,
+        "date_from": date_from,
+        "date_to": date_to,
+    }
+    controllers.sync_feed_filters(filters)
+    infinite = st.toggle("Infinite scroll", key="infinite_scroll")
+
+    if infinite:
+        render_feed(filters, public)
+    else:
+        render_paged_listings(filters, public)
+
 
-    if not filtered_items:
+def render_item_card(item, public=False, page_owners=()):
+    """Render a single listing card; page_owners are resolved together on a contact reveal"""
+    with st.container():
+        st.markdown("---")
+        c1, c2 = st.columns([1, 3])
+        with c1:
+            render_image(item, size="card", use_container_width=True)
+        with c2:
+            st.subheader(item['title'])
+            type_color = "red" if item['type'] == 'Lost' else "green"
+            status_color = "green" if item.get('status') == 'Resolved' else "orange"
+            st.markdown(
+                f"<span style='background:{type_color};color:white;padding:2px 10px;border-radius:12px;font-size:0.85em;'>{item['type']}</span> "
+                f"<span style='background:{status_color};color:white;padding:2px 10px;border-radius:12px;font-size:0.85em;'>{item.get('status', 'Active')}</span>",
+                unsafe_allow_html=True
+            )
+            st.caption(
+                f"📂 {item.get('category', 'Other')} | Posted by {item['owner']} on {item['date']} | 📍 {item['location']}"
+            )
+            st.write(item['description'])
+
+            if not public:
+                render_contact_panel(item['owner'], item['id'], page_owners)
+            else:
+                st.caption("Login to view contact info")
+
+
+@st.fragment
+def render_contact_panel(owner, item_id, page_owners=()):
+    """Contact Owner button of one card; revealing re-executes only this fragment"""
+    if st.button("📞 Contact Owner", key=f"contact_{item_id}"):
+        # One query resolves every owner on the page; later reveals hit the cache
+        contact = utils.get_user_contacts([owner, *page_owners])[owner]
+        st.success(f"Contact Info: {contact}")
+
+
+def render_paged_listings(filters, public=False):
+    """Render one page of listings with Previous/Next cursor navigation"""
+    cursors = st.session_state["page_cursors"]
+    page_items, total_items, next_cursor = controllers.query_items(**filters, cursor=cursors[-1])
+
+    if not total_items:
         st.info("No items found.")
-    else:
-        st.caption(f"Showing {len(filtered_items)} item(s)")
+        return
 
-        page_items, total_items, total_pages = controllers.get_paginated_items(
-            filtered_items,
-            st.session_state["page"]
-        )
+    st.caption(f"Showing {total_items} item(s)")
+    page_owners = [item['owner'] for item in page_items]
+    for item in page_items:
+        render_item_card(item, public, page_owners)
 
-        for item in page_items:
-            with st.container():
-                st.markdown("---")
-                c1, c2 = st.columns([1, 3])
-                with c1:
-                    render_image(item.get("image"), use_container_width=True)
-                with c2:
-                    st.subheader(item['title'])
-                    type_color = "red" if item['type'] == 'Lost' else "green"
-                    status_color = "green" if item.get('status') == 'Resolved' else "orange"
-                    st.markdown(
-                        f"<span style='background:{type_color};color:white;padding:2px 10px;border-radius:12px;font-size:0.85em;'>{item['type']}</span> "
-                        f"<span style='background:{status_color};color:white;padding:2px 10px;border-radius:12px;font-size:0.85em;'>{item.get('status', 'Active')}</span>",
-                        unsafe_allow_html=True
-                    )
-                    st.caption(
-                        f"📂 {item.get('category', 'Other')} | Posted by {item['owner']} on {item['date']} | 📍 {item['location']}"
-                    )
-                    st.write(item['description'])
-
-                    if not public:
-                        if st.button("📞 Contact Owner", key=f"contact_{item['id']}"):
-                            contact = utils.get_user_contact(item['owner'])
-                            st.success(f"Contact Info: {contact}")
-                    else:
-                        st.caption("Login to view contact info")
+    total_pages = max(1, (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
+    if total_pages > 1:
+        st.markdown("---")
+        pcol1, pcol2, pcol3 = st.columns([1, 2, 1])
+        # Callbacks update the cursor stack before the fragment re-executes
+        with pcol1:
+            st.button("⬅️ Previous", disabled=(len(cursors) <= 1),
+                      on_click=controllers.go_to_previous_page)
+        with pcol2:
+            st.markdown(f"<center>Page {len(cursors)} of {total_pages}</center>", unsafe_allow_html=True)
+        with pcol3:
+            st.button("Next ➡️", disabled=(next_cursor is None),
+                      on_click=controllers.go_to_next_page, args=(next_cursor,))
+
+
+def render_feed(filters, public=False):
+    """Render the infinite-scroll feed, appending a batch on each Load more click"""
+    if not st.session_state["feed_loaded"]:
+        controllers.load_more_items(filters)
+
+    feed_items = st.session_state["feed_items"]
+    if not feed_items:
+        st.info("No items found.")
+        return
 
-        if total_pages > 1:
-            st.markdown("---")
-            pcol1, pcol2, pcol3 = st.columns([1, 2, 1])
-            with pcol1:
-                if st.button("⬅️ Previous", disabled=(st.session_state["page"] <= 1)):
-                    st.session_state["page"] -= 1
-                    st.rerun()
-            with pcol2:
-                st.markdown(f"<center>Page {st.session_state['page']} of {total_pages}</center>", unsafe_allow_html=True)
-            with pcol3:
-                if st.button("Next ➡️", disabled=(st.session_state["page"] >= total_pages)):
-                    st.session_state["page"] += 1
-                    st.rerun()
+    st.caption(f"Showing {len(feed_items)} of {st.session_state['feed_total']} item(s)")
+    # Resolve contacts for the latest batch together
+    page_owners = [item['owner'] for item in feed_items[-ITEMS_PER_PAGE:]]
+    for item in feed_items:
+        render_item_card(item, public, page_owners)
+
+    if st.session_state["feed_cursor"] is not None:
+        st.markdown("---")
+        st.button("Load more", key="feed_load_more", on_click=controllers.load_more_items,
+                  args=(filters,), use_container_width=True)
 
 
 def render_post_item_page():
     """Render post item page"""
-    # If redirecting after a successful post, go to Home immediately
-    if st.session_state.get("_post_success"):
-        st.session_state["_post_success"] = False
-        st.session_state["menu"] = "Home"
-        st.session_state["page"] = 1
-        st.rerun()
-
     st.header("Post a New Item")
-
-    title = st.text_input("Item Title")
-    itype = st.selectbox("Type", CATEGORIES)
-    category = st.selectbox("Category", CATEGORIES)
-    description = st.text_area("Description")
-    location = st.text_input("Location (City, Area, Place)")
-    date_str = st.date_input("Date Lost/Found", datetime.today())
-    uploaded_file = st.file_uploader("Upload Image", type=["png", "jpg", "jpeg"])
-
-    if st.button("Post Item", type="primary"):
-        if controllers.handle_post_item(title, itype, category, description, location, date_str, uploaded_file):
-            st.session_state["_post_success"] = True
-            st.rerun()
+    render_flash()
+
+    st.text_input("Item Title", key="post_title")
+    st.selectbox("Type", ITEM_TYPES, key="post_type")
+    st.selectbox("Category", CATEGORIES, key="post_category")
+    st.text_area("Description", key="post_description")
+    st.text_input("Location (City, Area, Place)", key="post_location")
+    st.date_input("Date Lost/Found", datetime.today(), key="post_date")
+    st.file_uploader("Upload Image", type=["png", "jpg", "jpeg"], key="post_image")
+
+    # The callback saves and switches to Home before the next run draws anything
+    st.button("Post Item", type="primary", on_click=controllers.handle_post_item_click)
+
+
+def render_matches(matches):
+    """List the open items of the opposite type that may be the same object"""
+    if not matches:
+        return
+    st.markdown(f"**🔗 Possible matches ({len(matches)})**")
+    for other, score in matches:
+        st.caption(
+            f"{other['type']}: **{other['title']}** — {other['date']} at {other['location']} "
+            f"(posted by {other['owner']}, {score:.0%} match)"
+        )
 
 
 def render_my_items_page():
     """Render my items page"""
     st.header("My Items")
     user = st.session_state["user"]
-    items = utils.load_items()
-
-    my_items = [i for i in items if i['owner'] == user]
+    page = st.session_state.get("my_items_page", 1)
+    my_items, total_items = utils.load_items_by_owner(
+        user, skip=(page - 1) * ITEMS_PER_PAGE, limit=ITEMS_PER_PAGE
+    )
+    total_pages = max(1, (total_items + ITEMS_PER_PAGE - 1) // ITEMS_PER_PAGE)
+    if page > total_pages:
+        # Last item on the final page was deleted: show the new last page in this run
+        page = st.session_state["my_items_page"] = total_pages
+        my_items, total_items = utils.load_items_by_owner(
+            user, skip=(page - 1) * ITEMS_PER_PAGE, limit=ITEMS_PER_PAGE
+        )
 
     if not my_items:
         st.info("You haven't posted any items yet.")
     else:
+        matches = utils.get_item_matches([item['id'] for item in my_items])
         for item in my_items:
             type_label = item['type']
             status_label = item.get('status', 'Active')
@@ -282,32 +379,39 @@ def render_my_items_page():
                 st.write(f"**Description:** {item['description']}")
                 st.write(f"**Location:** {item['location']}")
                 st.write(f"**Date:** {item['date']}")
-                render_image(item.get("image"), width=200)
+                render_image(item, size="small", width=200)
+                render_matches(matches.get(item['id'], []))
 
                 bcol1, bcol2 = st.columns(2)
                 with bcol1:
                     if item.get('status', 'Active') == 'Active':
-                        if st.button("✅ Mark as Resolved", key=f"resolve_{item['id']}"):
-                            controllers.handle_update_item_status(item['id'], 'Resolved')
+                        st.button("✅ Mark as Resolved", key=f"resolve_{item['id']}",
+                                  on_click=controllers.handle_update_item_status, args=(item['id'], 'Resolved'))
                     else:
-                        if st.button("🔄 Mark as Active", key=f"activate_{item['id']}"):
-                            controllers.handle_update_item_status(item['id'], 'Active')
+                        st.button("🔄 Mark as Active", key=f"activate_{item['id']}",
+                                  on_click=controllers.handle_update_item_status, args=(item['id'], 'Active'))
                 with bcol2:
-                    confirm_key = f"confirm_del_{item['id']}"
-                    if confirm_key not in st.session_state:
-                        st.session_state[confirm_key] = False
-
-                    if not st.session_state[confirm_key]:
-                        if st.button("🗑️ Delete Item", key=f"del_{item['id']}"):
-                            st.session_state[confirm_key] = True
-                            st.rerun()
+                    if not st.session_state.get(f"confirm_del_{item['id']}", False):
+                        st.button("🗑️ Delete Item", key=f"del_{item['id']}",
+                                  on_click=controllers.handle_confirm_delete, args=(item['id'], True))
                     else:
                         st.warning("Are you sure you want to delete this item?")
                         dc1, dc2 = st.columns(2)
                         with dc1:
-                            if st.button("Yes, Delete", key=f"yes_del_{item['id']}", type="primary"):
-                                controllers.handle_delete_item(item['id'])
+                            st.button("Yes, Delete", key=f"yes_del_{item['id']}", type="primary",
+                                      on_click=controllers.handle_delete_item, args=(item['id'],))
                         with dc2:
-                            if st.button("Cancel", key=f"cancel_del_{item['id']}"):
-                                st.session_state[confirm_key] = False
-                                st.rerun()
+                            st.button("Cancel", key=f"cancel_del_{item['id']}",
+                                      on_click=controllers.handle_confirm_delete, args=(item['id'], False))
+
+        if total_pages > 1:
+            st.markdown("---")
+            pcol1, pcol2, pcol3 = st.columns([1, 2, 1])
+            with pcol1:
+                st.button("⬅️ Previous", key="my_items_prev", disabled=(page <= 1),
+                          on_click=controllers.handle_my_items_page, args=(page - 1,))
+            with pcol2:
+                st.markdown(f"<center>Page {page} of {total_pages}</center>", unsafe_allow_html=True)
+            with pcol3:
+                st.button("Next ➡️", key="my_items_next", disabled=(page >= total_pages),
+                          on_click=controllers.handle_my_items_page, args=(page + 1,))